@@ -0,0 +1,296 @@
+# Motor bancário sem interface, particionado por número de conta.
+#
+# Cada partição é um processo com o seu próprio sistema_bancario_poo (e o seu
+# próprio GIL); a conta de número n mora na partição n % particoes. O
+# coordenador recebe lotes de comandos, separa as linhas por partição, manda
+# cada sublote pelo Pipe da partição e só depois espera as respostas, então as
+# partições trabalham em paralelo.
+#
+# Transferências entre contas da mesma partição usam banco.transferir.
+# Entre partições, a transferência é feita em duas fases dentro do lote:
+#   1. a partição de origem valida e reserva o valor (o saldo já sai da
+#      conta) e a de destino confirma que a conta existe e comporta o valor;
+#   2. se as duas aceitaram, o destino lança o crédito, conferindo de novo o
+#      saldo máximo; com o crédito feito, a origem lança o débito, senão a
+#      reserva volta para a conta de origem.
+# O crédito de uma transferência entre partições só aparece no fim do lote.
+# A reserva não gera lançamento e o snapshot guarda o saldo dos lançamentos
+# (ver persistencia_bancaria.capturar_estado); com persistência, se a
+# partição cair entre as duas fases, a recuperação refaz o saldo pelos
+# lançamentos e a reserva simplesmente não existe.
+#
+# As partições são iniciadas com "spawn", então o programa que cria o motor
+# precisa do `if __name__ == "__main__":`.
+#
+# Uso:
+#     with MotorParticionado(4) as motor:
+#         motor.criar_cliente("00000000000", "Ana", "01/01/1990", "Rua X, 1")
+#         numero = motor.criar_conta("00000000000")
+#         motor.processar([(numero, "D", 10_000), (numero, "T", 1_000, outro)])
+#
+# Os valores são centavos inteiros (ver dinheiro.py).
+import itertools
+import multiprocessing
+import os
+import time
+from array import array
+
+import dinheiro
+import sistema_bancario_poo as banco
+
+TRANSFERENCIA = "T"
+RESERVA = "R"
+VERIFICACAO = "V"
+
+
+class Particao:
+    def __init__(self):
+        self.contas = banco.registro.contas
+        self.reservas = {}
+
+    def criar_cliente(self, cpf, nome, data_nascimento, endereco):
+        cliente = banco.PessoaFisica(endereco, cpf, nome, data_nascimento)
+        return banco.registro.adicionar_cliente(cliente)
+
+    def criar_conta(self, numero, cpf):
+        cliente = banco.registro.buscar_cliente(cpf)
+        if cliente is None:
+            return False
+        conta = banco.ContaCorrente(cliente, numero)
+        if not banco.registro.adicionar_conta(conta):
+            return False
+        cliente.adicionar_conta(conta)
+        return True
+
+    def ultimo_numero(self):
+        return max((numero for _, numero in self.contas), default=0)
+
+    def saldo(self, numero, agencia="0001"):
+        conta = self.contas.get((agencia, numero))
+        return None if conta is None else conta.saldo
+
+    def resumo(self):
+        contas = self.contas.values()
+        return len(contas), sum(conta.saldo for conta in contas), sum(len(conta.historico) for conta in contas)
+
+    # Primeira fase: linhas (numero, tipo, valor[, destino ou referência]).
+    def executar(self, linhas, agencia="0001"):
+        contas = self.contas
+        data = int(time.time())
+        resultados = array("b")
+        with banco.confirmacao_em_lote():
+            for linha in linhas:
+                conta = contas.get((agencia, linha[0]))
+                tipo = linha[1]
+                if conta is None:
+                    resultado = banco.CONTA_INEXISTENTE
+                elif tipo == RESERVA:
+                    resultado = self.reservar(conta, linha[2], linha[3])
+                elif tipo == VERIFICACAO:
+                    # Um valor inválido é recusado pela origem, na reserva.
+                    if dinheiro.positivo(linha[2]) and not dinheiro.cabe(conta.saldo, linha[2]):
+                        resultado = banco.SALDO_EXCEDIDO
+                    else:
+                        resultado = banco.ACEITA
+                elif tipo == TRANSFERENCIA:
+                    destino = contas.get((agencia, linha[3]))
+                    if destino is None:
+                        resultado = banco.CONTA_INEXISTENTE
+                    else:
+                        resultado = banco.transferir(conta, destino, linha[2], data=data)
+                else:
+                    resultado = banco.aplicar_movimento(conta, banco.TIPOS_LOTE.get(tipo), linha[2], data)
+                resultados.append(resultado)
+        return resultados
+
+    def reservar(self, conta, valor, referencia):
+        with conta.trava:
+            if not dinheiro.positivo(valor):
+                return banco.VALOR_INVALIDO
+            if valor > conta.saldo:
+                return banco.SALDO_INSUFICIENTE
+            conta.saldo -= valor
+            self.reservas[referencia] = (conta, valor)
+            return banco.ACEITA
+
+    # Segunda fase, no destino: os créditos. Outras linhas do lote podem ter
+    # mudado o saldo depois da verificação, então o máximo é conferido de novo.
+    def creditar(self, creditos, agencia="0001"):
+        data = int(time.time())
+        codigo_recebida = banco.Historico.CODIGOS["Transferência recebida"]
+        resultados = array("b")
+        with banco.confirmacao_em_lote():
+            for numero, valor in creditos:
+                conta = self.contas[(agencia, numero)]
+                with conta.trava:
+                    if not dinheiro.cabe(conta.saldo, valor):
+                        resultados.append(banco.SALDO_EXCEDIDO)
+                        continue
+                    conta.saldo += valor
+                    conta.historico.adicionar(codigo_recebida, valor, data)
+                resultados.append(banco.ACEITA)
+        return resultados
+
+    # Segunda fase, na origem: débitos confirmados e reservas canceladas.
+    def finalizar(self, confirmadas, canceladas):
+        data = int(time.time())
+        codigo_enviada = banco.Historico.CODIGOS["Transferência enviada"]
+        with banco.confirmacao_em_lote():
+            for referencia in confirmadas:
+                conta, valor = self.reservas.pop(referencia)
+                with conta.trava:
+                    conta.historico.adicionar(codigo_enviada, valor, data)
+            for referencia in canceladas:
+                conta, valor = self.reservas.pop(referencia)
+                with conta.trava:
+                    conta.saldo += valor
+
+
+def _trabalhador(conexao, diretorio):
+    if diretorio is not None:
+        import persistencia_bancaria
+
+        persistencia_bancaria.ativar(diretorio)
+    particao = Particao()
+    try:
+        while True:
+            mensagem = conexao.recv()
+            if mensagem is None:
+                break
+            operacao, argumentos = mensagem
+            conexao.send(getattr(particao, operacao)(*argumentos))
+    finally:
+        if diretorio is not None:
+            persistencia_bancaria.desativar()
+        conexao.close()
+
+
+class MotorParticionado:
+    def __init__(self, particoes, diretorio=None):
+        contexto = multiprocessing.get_context("spawn")
+        self.conexoes = []
+        self.processos = []
+        for indice in range(particoes):
+            local, remota = contexto.Pipe()
+            subdiretorio = None if diretorio is None else os.path.join(diretorio, f"particao-{indice}")
+            processo = contexto.Process(target=_trabalhador, args=(remota, subdiretorio), daemon=True)
+            processo.start()
+            remota.close()
+            self.conexoes.append(local)
+            self.processos.append(processo)
+        self._numeros = itertools.count(max(self._todas("ultimo_numero")) + 1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def __len__(self):
+        return len(self.conexoes)
+
+    def particao(self, numero):
+        return numero % len(self.conexoes)
+
+    def _chamar(self, indice, operacao, *argumentos):
+        self.conexoes[indice].send((operacao, argumentos))
+        return self.conexoes[indice].recv()
+
+    def _todas(self, operacao, *argumentos):
+        for conexao in self.conexoes:
+            conexao.send((operacao, argumentos))
+        return [conexao.recv() for conexao in self.conexoes]
+
+    # Os clientes são poucos e pequenos, então ficam copiados em todas as
+    # partições; cada conta existe só na partição dona do seu número.
+    def criar_cliente(self, cpf, nome, data_nascimento, endereco):
+        return all(self._todas("criar_cliente", cpf, nome, data_nascimento, endereco))
+
+    def criar_conta(self, cpf):
+        numero = next(self._numeros)
+        if not self._chamar(self.particao(numero), "criar_conta", numero, cpf):
+            return None
+        return numero
+
+    def saldo(self, numero):
+        return self._chamar(self.particao(numero), "saldo", numero)
+
+    def resumo(self):
+        contas, saldo, lancamentos = zip(*self._todas("resumo"))
+        return sum(contas), sum(saldo), sum(lancamentos)
+
+    # Recebe linhas (numero, tipo, valor) com tipo "D" ou "S", ou
+    # (origem, "T", valor, destino) para transferências, com valor em
+    # centavos inteiros, e devolve um código de resultado por linha, na ordem
+    # do lote.
+    def processar(self, linhas):
+        quantidade = len(self.conexoes)
+        sublotes = [[] for _ in range(quantidade)]
+        posicoes = [[] for _ in range(quantidade)]
+        remotas = []
+        for posicao, linha in enumerate(linhas):
+            numero = int(linha[0])
+            particao = numero % quantidade
+            if linha[1] == TRANSFERENCIA and int(linha[3]) % quantidade != particao:
+                destino = int(linha[3])
+                sublotes[particao].append((numero, RESERVA, linha[2], posicao))
+                posicoes[particao].append(posicao)
+                sublotes[destino % quantidade].append((destino, VERIFICACAO, linha[2]))
+                posicoes[destino % quantidade].append(-1 - posicao)
+                remotas.append((posicao, particao, destino, linha[2]))
+            else:
+                sublotes[particao].append((numero, linha[1], linha[2], *(int(x) for x in linha[3:])))
+                posicoes[particao].append(posicao)
+        for conexao, sublote in zip(self.conexoes, sublotes):
+            conexao.send(("executar", (sublote,)))
+        resultados = array("b", bytes(len(linhas)))
+        verificacoes = {}
+        for conexao, indices in zip(self.conexoes, posicoes):
+            for posicao, resultado in zip(indices, conexao.recv()):
+                if posicao < 0:
+                    verificacoes[-1 - posicao] = resultado
+                else:
+                    resultados[posicao] = resultado
+        if remotas:
+            self._concluir_transferencias(remotas, resultados, verificacoes)
+        return resultados
+
+    # Os créditos vão primeiro: uma reserva só vira débito depois que o
+    # destino lançou o crédito.
+    def _concluir_transferencias(self, remotas, resultados, verificacoes):
+        quantidade = len(self.conexoes)
+        confirmadas = [[] for _ in range(quantidade)]
+        canceladas = [[] for _ in range(quantidade)]
+        creditos = [[] for _ in range(quantidade)]
+        posicoes = [[] for _ in range(quantidade)]
+        for posicao, particao, destino, valor in remotas:
+            if resultados[posicao] != banco.ACEITA:
+                continue
+            if verificacoes[posicao] == banco.ACEITA:
+                creditos[destino % quantidade].append((destino, valor))
+                posicoes[destino % quantidade].append((posicao, particao))
+            else:
+                canceladas[particao].append(posicao)
+                resultados[posicao] = verificacoes[posicao]
+        for conexao, sublote in zip(self.conexoes, creditos):
+            conexao.send(("creditar", (sublote,)))
+        for conexao, indices in zip(self.conexoes, posicoes):
+            for (posicao, particao), resultado in zip(indices, conexao.recv()):
+                if resultado == banco.ACEITA:
+                    confirmadas[particao].append(posicao)
+                else:
+                    canceladas[particao].append(posicao)
+                    resultados[posicao] = resultado
+        for indice, conexao in enumerate(self.conexoes):
+            conexao.send(("finalizar", (confirmadas[indice], canceladas[indice])))
+        for conexao in self.conexoes:
+            conexao.recv()
+
+    def fechar(self):
+        for conexao in self.conexoes:
+            conexao.send(None)
+            conexao.close()
+        for processo in self.processos:
+            processo.join()
+        self.conexoes = []
+        self.processos = []
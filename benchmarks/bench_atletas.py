@@ -0,0 +1,87 @@
+# Benchmarks HTTP da API de atletas (desafio_fastAPI) com SQLite.
+#
+# A API grava em ./test.db, então o módulo roda num diretório temporário com
+# ATLETAS atletas já cadastrados, sem tocar no banco do diretório atual.
+import itertools
+import os
+
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+ATLETAS = 10_000
+
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    diretorio = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("atletas"))
+    try:
+        import desafio_fastAPI as api
+
+        api.Base.metadata.create_all(bind=api.engine)
+        with api.SessionLocal() as db:
+            categoria = api.CategoriaModel(nome="Scale")
+            centro = api.CentroDeTreinamentoModel(nome="CT King", endereco="Rua X, 10", proprietario="Marcos")
+            db.add_all([categoria, centro])
+            db.flush()
+            db.bulk_insert_mappings(api.AtletaModel, [
+                {
+                    "nome": f"Atleta {indice}",
+                    "cpf": f"{indice:011d}",
+                    "idade": 20 + indice % 30,
+                    "peso": 60 + indice % 40,
+                    "altura": 160 + indice % 40,
+                    "sexo": "F" if indice % 2 else "M",
+                    "centro_de_treinamento_id": centro.id,
+                    "categoria_id": categoria.id,
+                }
+                for indice in range(ATLETAS)
+            ])
+            db.commit()
+        yield api
+    finally:
+        os.chdir(diretorio)
+
+
+@pytest.fixture(scope="module")
+def novo_atleta(api):
+    with api.SessionLocal() as db:
+        atleta = db.get(api.AtletaModel, 1)
+        return {
+            "nome": "Novo", "idade": 25, "peso": 70, "altura": 175, "sexo": "F",
+            "centro_de_treinamento_id": atleta.centro_de_treinamento_id, "categoria_id": atleta.categoria_id,
+        }
+
+
+@pytest.fixture(scope="module")
+def cliente(api):
+    with TestClient(api.app) as cliente:
+        yield cliente
+
+
+def bench_read_atletas(benchmark, cliente):
+    resposta = benchmark(cliente.get, "/atletas/?page=2&size=50")
+    assert resposta.status_code == 200
+    assert len(resposta.json()["items"]) == 50
+
+
+def bench_read_atletas_fast(benchmark, cliente):
+    resposta = benchmark(cliente.get, "/atletas/?page=2&size=50&fast=true")
+    assert resposta.status_code == 200
+
+
+def bench_read_atletas_cursor(benchmark, cliente):
+    resposta = benchmark(cliente.get, f"/atletas/cursor/?after={ATLETAS // 2}&limit=50")
+    assert resposta.status_code == 200
+
+
+def bench_create_atleta(benchmark, cliente, novo_atleta):
+    cpfs = (f"9{numero:010d}" for numero in itertools.count())
+
+    def criar():
+        return cliente.post("/atletas/", json={**novo_atleta, "cpf": next(cpfs)})
+
+    resposta = benchmark(criar)
+    assert resposta.status_code == 200
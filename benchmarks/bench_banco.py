@@ -0,0 +1,151 @@
+# Benchmarks das operações bancárias: busca de clientes, depósitos e saques
+# nos três módulos e extrato com históricos grandes.
+import contextlib
+import io
+import random
+
+import pytest
+
+import desafio_otimizacao_conta_banco as otimizacao
+import dinheiro
+import sistema_banco_mvp as mvp
+import sistema_bancario_poo as banco
+
+CLIENTES = 100_000
+BUSCAS = 1_000
+OPERACOES = 10_000
+CONTAS = 1_000
+HISTORICO = 1_000_000
+HISTORICO_COMPLETO = 100_000
+SEM_LIMITE = float("inf")
+
+
+def silencioso(funcao):
+    def executar():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return funcao()
+    return executar
+
+
+@pytest.fixture
+def registro():
+    anterior = banco.registro
+    banco.registro = banco.Registro()
+    yield banco.registro
+    banco.registro = anterior
+
+
+def nova_conta(numero=1):
+    cliente = banco.PessoaFisica("Rua Teste, 1", f"{numero:011d}", "Benchmark", "01/01/2000")
+    conta = banco.ContaCorrente(cliente, numero, limite=SEM_LIMITE, limite_saques=SEM_LIMITE)
+    return conta
+
+
+def preencher(historico, quantidade):
+    inicio = 1_700_000_000
+    for indice in range(quantidade):
+        historico.gravar(indice % 2, 100 + indice % 10_000, inicio + indice)
+
+
+#### sistema_bancario_poo ####
+
+def bench_buscar_cliente_por_cpf(benchmark, registro):
+    for indice in range(CLIENTES):
+        registro.adicionar_cliente(banco.PessoaFisica("Rua Teste, 1", f"{indice:011d}", "Cliente", "01/01/2000"))
+    cpfs = [f"{indice:011d}" for indice in random.Random(42).sample(range(CLIENTES), BUSCAS)]
+
+    def buscar():
+        return sum(banco.buscar_cliente_por_cpf(cpf) is not None for cpf in cpfs)
+
+    assert benchmark(buscar) == BUSCAS
+
+
+def bench_poo_deposito_e_saque(benchmark):
+    conta = nova_conta()
+
+    def operar():
+        for _ in range(OPERACOES // 2):
+            banco.Deposito(1_000).registrar(conta)
+            banco.Saque(500).registrar(conta)
+
+    benchmark(operar)
+
+
+def bench_poo_processar_lote(benchmark, registro):
+    cliente = banco.PessoaFisica("Rua Teste, 1", "00000000000", "Benchmark", "01/01/2000")
+    registro.adicionar_cliente(cliente)
+    for _ in range(CONTAS):
+        conta = banco.abrir_conta_corrente(cliente)
+        conta.limite = SEM_LIMITE
+        conta.limite_saques = SEM_LIMITE
+    aleatorio = random.Random(42)
+    linhas = [
+        (aleatorio.randint(1, CONTAS), "D" if indice % 2 == 0 else "S", 500)
+        for indice in range(OPERACOES)
+    ]
+    resultados = benchmark(banco.processar_lote, linhas)
+    assert len(resultados) == OPERACOES
+
+
+def bench_poo_extrato_pagina(benchmark):
+    conta = nova_conta()
+    preencher(conta.historico, HISTORICO)
+    benchmark(silencioso(lambda: banco.exibir_extrato(conta, pagina=1)))
+
+
+def bench_poo_extrato_completo(benchmark):
+    conta = nova_conta()
+    preencher(conta.historico, HISTORICO_COMPLETO)
+    benchmark(silencioso(lambda: banco.exibir_extrato(conta)))
+
+
+def bench_poo_saldo_em(benchmark):
+    conta = nova_conta()
+    preencher(conta.historico, HISTORICO)
+    datas = [1_700_000_000 + indice for indice in random.Random(42).sample(range(HISTORICO), BUSCAS)]
+    benchmark(lambda: [conta.saldo_em(data) for data in datas])
+
+
+#### desafio_otimizacao_conta_banco ####
+
+def bench_otimizacao_deposito_e_saque(benchmark):
+    saques_do_dia = dinheiro.LimiteDiario(SEM_LIMITE)
+
+    def operar():
+        saldo, extrato = 0, []
+        for _ in range(OPERACOES // 2):
+            saldo, extrato, _ = otimizacao.depositar(saldo, 1_000, extrato)
+            saldo, extrato, _ = otimizacao.sacar(
+                saldo=saldo, valor=500, extrato=extrato, limite=50_000, saques_do_dia=saques_do_dia
+            )
+        return saldo
+
+    assert benchmark(operar) == OPERACOES // 2 * 500
+
+
+def bench_otimizacao_extrato(benchmark):
+    extrato = [f"Depósito: R$1.00 - 2024-01-01 12:00:00.{indice:06d}" for indice in range(HISTORICO)]
+    benchmark(otimizacao.exibir_extrato, 0, extrato=extrato)
+
+
+#### sistema_banco_mvp ####
+
+@pytest.fixture
+def estado_mvp(monkeypatch):
+    monkeypatch.setattr(mvp, "saldo", 0)
+    monkeypatch.setattr(mvp, "extrato", [])
+    monkeypatch.setattr(mvp, "saques_do_dia", dinheiro.LimiteDiario(SEM_LIMITE))
+
+
+def bench_mvp_deposito_e_saque(benchmark, estado_mvp):
+    def operar():
+        for _ in range(OPERACOES // 2):
+            mvp.depositar(1_000)
+            mvp.sacar(500)
+
+    benchmark(silencioso(operar))
+
+
+def bench_mvp_extrato(benchmark, estado_mvp):
+    mvp.extrato.extend(f"Depósito: R$1.00 - 2024-01-01 12:00:00.{indice:06d}" for indice in range(HISTORICO_COMPLETO))
+    benchmark(silencioso(mvp.exibir_extrato))
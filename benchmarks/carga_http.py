@@ -0,0 +1,59 @@
+# Gerador de carga HTTP simples para comparar as APIs de atletas.
+#
+# Suba a versão síncrona e a assíncrona em portas diferentes, por exemplo:
+#   uvicorn desafio_fastAPI:app --port 8000
+#   uvicorn desafio_fastAPI_async:app --port 8001
+# e rode:
+#   python benchmarks/carga_http.py http://localhost:8000/atletas/ 1000 20000
+#   python benchmarks/carga_http.py http://localhost:8001/atletas/ 1000 20000
+import asyncio
+import sys
+import time
+
+import httpx
+
+
+def percentil(valores, p):
+    indice = min(len(valores) - 1, int(len(valores) * p / 100))
+    return valores[indice]
+
+
+async def cliente(http, url, fila, latencias, erros):
+    while True:
+        try:
+            fila.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        inicio = time.perf_counter()
+        try:
+            resposta = await http.get(url)
+            if resposta.status_code >= 400:
+                erros.append(resposta.status_code)
+        except httpx.HTTPError as erro:
+            erros.append(type(erro).__name__)
+        latencias.append(time.perf_counter() - inicio)
+
+
+async def executar(url, conexoes, requisicoes):
+    fila = asyncio.Queue()
+    for _ in range(requisicoes):
+        fila.put_nowait(None)
+    latencias, erros = [], []
+    limites = httpx.Limits(max_connections=conexoes, max_keepalive_connections=conexoes)
+    async with httpx.AsyncClient(limits=limites, timeout=60) as http:
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente(http, url, fila, latencias, erros) for _ in range(conexoes)))
+        duracao = time.perf_counter() - inicio
+    latencias.sort()
+    print(f"{url} com {conexoes} conexões")
+    print(f"  requisições/s: {len(latencias) / duracao:,.0f}")
+    for p in (50, 95, 99):
+        print(f"  p{p}: {percentil(latencias, p) * 1000:.1f} ms")
+    print(f"  erros: {len(erros)}")
+
+
+if __name__ == "__main__":
+    url = sys.argv[1]
+    conexoes = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    requisicoes = int(sys.argv[3]) if len(sys.argv) > 3 else 20_000
+    asyncio.run(executar(url, conexoes, requisicoes))
@@ -0,0 +1,121 @@
+# Gerador de carga para o servidor_bancario.
+#
+# Abre muitas conexões simultâneas; cada uma manda `profundidade` comandos de
+# uma vez (pipelining), lê as respostas e repete. A latência de cada comando
+# vai do envio do grupo até a chegada da sua resposta.
+#
+# Quase metade dos comandos são saques, então o servidor precisa abrir as
+# contas sem limite de saques, como as contas dos outros benchmarks; senão a
+# carga mede sobretudo recusas. Suba o servidor e rode, por exemplo:
+#   python servidor_bancario.py 127.0.0.1:7000 --contas-sem-limite
+#   python benchmarks/carga_servidor.py 127.0.0.1:7000 2000 200000 8
+#
+# Uso: python benchmarks/carga_servidor.py [endereco] [conexoes] [comandos] [profundidade]
+import asyncio
+import random
+import sys
+import time
+
+CPF = "00000000000"
+CONTAS = 1000
+
+
+def percentil(valores, p):
+    indice = min(len(valores) - 1, int(len(valores) * p / 100))
+    return valores[indice]
+
+
+async def conectar(endereco):
+    if endereco.startswith("unix:"):
+        return await asyncio.open_unix_connection(endereco[len("unix:"):])
+    host, _, porta = endereco.rpartition(":")
+    return await asyncio.open_connection(host, int(porta))
+
+
+async def ler_resposta(leitor):
+    linha = await leitor.readline()
+    if not linha:
+        raise ConnectionError("servidor fechou a conexão")
+    campos = linha.rstrip(b"\n").split(b"\t")
+    if campos[0] == b"OK" and len(campos) == 3:
+        for _ in range(int(campos[2])):
+            await leitor.readline()
+    return campos[0] == b"OK"
+
+
+async def preparar(endereco):
+    leitor, escritor = await conectar(endereco)
+    escritor.write(f"USUARIO\t{CPF}\tCarga\t01/01/2000\tRua Teste, 1\n".encode())
+    escritor.write(b"".join(f"CONTA\t{CPF}\n".encode() for _ in range(CONTAS)))
+    await ler_resposta(leitor)
+    numeros = []
+    for _ in range(CONTAS):
+        numeros.append(int((await leitor.readline()).split(b"\t")[1]))
+    escritor.write(b"".join(f"DEPOSITAR\t{CPF}\t{numero}\t1000000\n".encode() for numero in numeros))
+    for _ in numeros:
+        await ler_resposta(leitor)
+    escritor.close()
+    return numeros
+
+
+def gerar_comando(aleatorio, numeros):
+    numero = aleatorio.choice(numeros)
+    sorteio = aleatorio.random()
+    if sorteio < 0.45:
+        return f"DEPOSITAR\t{CPF}\t{numero}\t{aleatorio.randint(1, 100)}\n".encode()
+    if sorteio < 0.9:
+        return f"SACAR\t{CPF}\t{numero}\t{aleatorio.randint(1, 100)}\n".encode()
+    return f"EXTRATO\t{CPF}\t{numero}\t1\t10\n".encode()
+
+
+async def cliente(endereco, numeros, fila, profundidade, semente, latencias, erros):
+    aleatorio = random.Random(semente)
+    leitor, escritor = await conectar(endereco)
+    try:
+        while True:
+            quantidade = 0
+            while quantidade < profundidade:
+                try:
+                    fila.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                quantidade += 1
+            if not quantidade:
+                return
+            inicio = time.perf_counter()
+            escritor.write(b"".join(gerar_comando(aleatorio, numeros) for _ in range(quantidade)))
+            for _ in range(quantidade):
+                if not await ler_resposta(leitor):
+                    erros.append(1)
+                latencias.append(time.perf_counter() - inicio)
+    finally:
+        escritor.close()
+
+
+async def executar(endereco, conexoes, comandos, profundidade):
+    numeros = await preparar(endereco)
+    fila = asyncio.Queue()
+    for _ in range(comandos):
+        fila.put_nowait(None)
+    latencias, erros = [], []
+    inicio = time.perf_counter()
+    await asyncio.gather(
+        *(cliente(endereco, numeros, fila, profundidade, semente, latencias, erros) for semente in range(conexoes))
+    )
+    duracao = time.perf_counter() - inicio
+    latencias.sort()
+    print(f"{endereco} com {conexoes} conexões, profundidade {profundidade}")
+    print(f"  comandos/s: {len(latencias) / duracao:,.0f}")
+    for p in (50, 95, 99):
+        print(f"  p{p}: {percentil(latencias, p) * 1000:.1f} ms")
+    print(f"  recusados (saldo, limite de saques etc.): {len(erros)}")
+    if erros:
+        print("  o servidor foi iniciado com --contas-sem-limite?")
+
+
+if __name__ == "__main__":
+    endereco = sys.argv[1] if len(sys.argv) > 1 else "127.0.0.1:7000"
+    conexoes = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    comandos = int(sys.argv[3]) if len(sys.argv) > 3 else 100_000
+    profundidade = int(sys.argv[4]) if len(sys.argv) > 4 else 8
+    asyncio.run(executar(endereco, conexoes, comandos, profundidade))
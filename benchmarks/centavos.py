@@ -0,0 +1,85 @@
+# Microbenchmark dos valores em centavos inteiros (dinheiro.py) contra o
+# caminho antigo em float.
+#
+# Mede a leitura do valor digitado, o lançamento no saldo e no histórico (que
+# no caminho antigo convertia o float para centavos a cada lançamento) e a
+# montagem das linhas do extrato, e mostra o erro acumulado do float ao somar
+# o mesmo valor muitas vezes.
+#
+# Uso: python benchmarks/centavos.py [lancamentos]
+import datetime
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dinheiro
+
+
+CONTAS = 1000
+
+
+# Lança os valores em CONTAS saldos e guarda o valor em centavos no
+# histórico, como num lote de depósitos.
+def lancar_float(valores):
+    saldos = [0.0] * CONTAS
+    historico = []
+    for indice, valor in enumerate(valores):
+        saldos[indice % CONTAS] += valor
+        historico.append(round(valor * 100))
+    return saldos
+
+
+def lancar_centavos(valores):
+    saldos = [0] * CONTAS
+    historico = []
+    for indice, valor in enumerate(valores):
+        saldos[indice % CONTAS] += valor
+        historico.append(valor)
+    return saldos
+
+
+def comparar(rotulo, antigo, novo, quantidade, repeticoes=5):
+    tempo_antigo = min(timeit.repeat(antigo, number=1, repeat=repeticoes))
+    tempo_novo = min(timeit.repeat(novo, number=1, repeat=repeticoes))
+    print(f"{rotulo}")
+    print(f"  float:    {tempo_antigo * 1e9 / quantidade:7.1f} ns/op")
+    print(f"  centavos: {tempo_novo * 1e9 / quantidade:7.1f} ns/op  ({tempo_antigo / tempo_novo:.2f}x)")
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    textos = [f"{i % 1000}.{i % 100:02d}" for i in range(quantidade)]
+    valores_float = [float(texto) for texto in textos]
+    valores_centavos = [dinheiro.centavos(texto) for texto in textos]
+    data = datetime.datetime(2024, 1, 1, 12, 0, 0)
+
+    comparar(
+        "leitura do valor digitado",
+        lambda: [float(texto) for texto in textos],
+        lambda: [dinheiro.centavos(texto) for texto in textos],
+        quantidade,
+    )
+    comparar(
+        "lançamento no saldo",
+        lambda: lancar_float(valores_float),
+        lambda: lancar_centavos(valores_centavos),
+        quantidade,
+    )
+    comparar(
+        "linha do extrato",
+        lambda: [f"Depósito: R${valor:.2f} - {data}" for valor in valores_float],
+        lambda: [f"Depósito: {dinheiro.formatar(valor)} - {data}" for valor in valores_centavos],
+        quantidade,
+    )
+
+    deriva = sum(lancar_float([0.1] * quantidade))
+    exato = sum(lancar_centavos([10] * quantidade))
+    print(f"{quantidade:,} depósitos de R$0.10")
+    print(f"  float:    {deriva!r}")
+    print(f"  centavos: {dinheiro.formatar(exato)}")
+
+
+if __name__ == "__main__":
+    main()
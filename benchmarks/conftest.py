@@ -0,0 +1,18 @@
+# Suíte de benchmarks com pytest-benchmark (pip install pytest-benchmark).
+#
+# Os arquivos bench_*.py só são coletados por este diretório, então o
+# `pytest` da raiz continua rodando apenas os testes. Rode sempre a partir da
+# raiz do repositório, para os resultados irem para benchmarks/.resultados:
+#
+#     python -m pytest benchmarks                              # só mede
+#     python -m pytest benchmarks --benchmark-save=baseline    # grava a base
+#     python -m pytest benchmarks --benchmark-compare          # compara
+#
+# Com --benchmark-compare cada benchmark é comparado com o último resultado
+# gravado e a execução falha se a mediana piorar mais de 15%
+# (--benchmark-compare-fail no pytest.ini; passe outro valor para mudar o
+# limite). Compare só resultados da mesma máquina.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,93 @@
+# Teste de estresse do sistema_bancario_poo com várias threads.
+#
+# Cada thread faz depósitos, saques e transferências aleatórias em contas
+# compartilhadas, pelos mesmos caminhos do menu e dos lotes
+# (aplicar_movimento e transferir), e soma o que foi aceito. No final, a soma
+# dos saldos precisa bater com depósitos - saques, e o saldo de cada conta
+# com o que o seu histórico registra: qualquer diferença indica atualização
+# perdida.
+#
+# Uso: python benchmarks/estresse_concorrencia.py [contas] [operacoes_por_thread]
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sistema_bancario_poo as banco
+
+
+def preparar_contas(quantidade):
+    banco.registro = banco.Registro()
+    banco.criar_usuario("Estresse", "01/01/2000", "00000000000", "Rua Teste, 1")
+    threads = [
+        threading.Thread(target=banco.criar_conta_corrente, args=("00000000000",))
+        for _ in range(quantidade)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    contas = list(banco.registro.contas.values())
+    numeros = sorted(conta.numero for conta in contas)
+    assert numeros == list(range(1, quantidade + 1)), "números de conta duplicados"
+    for conta in contas:
+        conta.limite = float("inf")
+        conta.limite_saques = float("inf")
+    return contas
+
+
+def trabalhador(contas, operacoes, semente, totais):
+    aleatorio = random.Random(semente)
+    depositado = sacado = 0
+    data = int(time.time())
+    for _ in range(operacoes):
+        conta = aleatorio.choice(contas)
+        valor = aleatorio.randint(1, 100)
+        operacao = aleatorio.random()
+        if operacao < 0.4:
+            if banco.aplicar_movimento(conta, banco.Deposito.tipo, valor, data) == banco.ACEITA:
+                depositado += valor
+        elif operacao < 0.8:
+            if banco.aplicar_movimento(conta, banco.Saque.tipo, valor, data) == banco.ACEITA:
+                sacado += valor
+        else:
+            banco.transferir(conta, aleatorio.choice(contas), valor)
+    totais.append((depositado, sacado))
+
+
+def executar(contas, numero_threads, operacoes):
+    saldo_inicial = sum(conta.saldo for conta in contas)
+    totais = []
+    threads = [
+        threading.Thread(target=trabalhador, args=(contas, operacoes, semente, totais))
+        for semente in range(numero_threads)
+    ]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+    esperado = saldo_inicial + sum(d for d, _ in totais) - sum(s for _, s in totais)
+    obtido = sum(conta.saldo for conta in contas)
+    assert obtido == esperado, f"saldo perdido: esperado {esperado}, obtido {obtido}"
+    for conta in contas:
+        historico = conta.historico
+        assert historico.saldo_apos(len(historico)) == conta.saldo, f"histórico da conta {conta.numero} diverge do saldo"
+    return numero_threads * operacoes / duracao
+
+
+def main():
+    quantidade_contas = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    operacoes = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    contas = preparar_contas(quantidade_contas)
+    for numero_threads in (1, 2, 4, 8):
+        vazao = executar(contas, numero_threads, operacoes)
+        print(f"{numero_threads} thread(s): {vazao:,.0f} operações/s, nenhum saldo perdido")
+
+
+if __name__ == "__main__":
+    main()
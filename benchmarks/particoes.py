@@ -0,0 +1,71 @@
+# Benchmark do motor particionado (banco_particionado) com 1, 2, 4 e 8
+# partições.
+#
+# Cria as contas, aplica lotes de depósitos, saques e transferências
+# aleatórias (10% delas entre contas quaisquer, portanto em boa parte entre
+# partições) e confere no final que o saldo total bate com depósitos - saques.
+# A escala depende de haver núcleos livres para as partições.
+#
+# Uso: python benchmarks/particoes.py [operacoes] [contas] [tamanho_lote]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sistema_bancario_poo as banco
+from banco_particionado import MotorParticionado
+
+
+def gerar_lotes(operacoes, contas, tamanho_lote):
+    aleatorio = random.Random(42)
+    lotes = []
+    for inicio in range(0, operacoes, tamanho_lote):
+        lote = []
+        for _ in range(min(tamanho_lote, operacoes - inicio)):
+            numero = aleatorio.randint(1, contas)
+            valor = aleatorio.randint(100, 10_000)
+            sorteio = aleatorio.random()
+            if sorteio < 0.45:
+                lote.append((numero, "D", valor))
+            elif sorteio < 0.9:
+                lote.append((numero, "S", valor))
+            else:
+                lote.append((numero, "T", valor, aleatorio.randint(1, contas)))
+        lotes.append(lote)
+    return lotes
+
+
+def executar(particoes, lotes, contas):
+    with MotorParticionado(particoes) as motor:
+        motor.criar_cliente("00000000000", "Benchmark", "01/01/2000", "Rua Teste, 1")
+        for _ in range(contas):
+            motor.criar_conta("00000000000")
+        motor.processar([(numero, "D", 100_000) for numero in range(1, contas + 1)])
+        esperado = 100_000 * contas
+        inicio = time.perf_counter()
+        for lote in lotes:
+            resultados = motor.processar(lote)
+            for linha, resultado in zip(lote, resultados):
+                if resultado == banco.ACEITA and linha[1] != "T":
+                    esperado += linha[2] if linha[1] == "D" else -linha[2]
+        duracao = time.perf_counter() - inicio
+        _, saldo, _ = motor.resumo()
+        assert saldo == esperado, f"saldo perdido: esperado {esperado}, obtido {saldo}"
+    return sum(map(len, lotes)) / duracao
+
+
+def main():
+    operacoes = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    contas = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    tamanho_lote = int(sys.argv[3]) if len(sys.argv) > 3 else 20_000
+    lotes = gerar_lotes(operacoes, contas, tamanho_lote)
+    print(f"{os.cpu_count()} CPU(s) disponíveis")
+    for particoes in (1, 2, 4, 8):
+        vazao = executar(particoes, lotes, contas)
+        print(f"{particoes} partição(ões): {vazao:,.0f} operações/s, nenhum saldo perdido")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Benchmark do diário (WAL) e da recuperação do sistema_bancario_poo.
+#
+# Grava N lançamentos com a persistência ativa, medindo transações/s com o
+# group commit, e depois mede o tempo de recuperação (snapshot + diário).
+#
+# Uso: python benchmarks/persistencia.py [lancamentos] [contas] [diretorio]
+#      python benchmarks/persistencia.py 10000000 10000
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import persistencia_bancaria
+import sistema_bancario_poo as banco
+
+LOTE = 10_000
+
+
+def gravar(diretorio, lancamentos, contas, snapshot_a_cada):
+    persistencia_bancaria.ativar(diretorio, snapshot_a_cada=snapshot_a_cada)
+    banco.criar_usuario("Benchmark", "01/01/2000", "00000000000", "Rua Teste, 1")
+    for _ in range(contas):
+        banco.criar_conta_corrente("00000000000")
+    aleatorio = random.Random(42)
+    inicio = time.perf_counter()
+    restantes = lancamentos
+    while restantes:
+        tamanho = min(LOTE, restantes)
+        linhas = [(aleatorio.randint(1, contas), "D", 1000) for _ in range(tamanho)]
+        banco.processar_lote(linhas)
+        restantes -= tamanho
+    banco.persistencia.diario.sincronizar()
+    duracao = time.perf_counter() - inicio
+    persistencia_bancaria.desativar()
+    return duracao
+
+
+def recuperar(diretorio):
+    inicio = time.perf_counter()
+    persistencia_bancaria.ativar(diretorio)
+    duracao = time.perf_counter() - inicio
+    total = sum(len(conta.historico) for conta in banco.registro.contas.values())
+    persistencia_bancaria.desativar()
+    return duracao, total
+
+
+def main():
+    lancamentos = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    contas = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    diretorio = sys.argv[3] if len(sys.argv) > 3 else tempfile.mkdtemp(prefix="banco-wal-")
+    try:
+        cenarios = (
+            ("só diário", 10 ** 18),
+            ("snapshot + cauda do diário", lancamentos * 2 // 3),
+        )
+        for nome, snapshot_a_cada in cenarios:
+            shutil.rmtree(diretorio, ignore_errors=True)
+            duracao = gravar(diretorio, lancamentos, contas, snapshot_a_cada)
+            tamanho = sum(os.path.getsize(os.path.join(diretorio, nome)) for nome in os.listdir(diretorio))
+            recuperacao, total = recuperar(diretorio)
+            assert total == lancamentos, f"recuperados {total} de {lancamentos} lançamentos"
+            print(f"{nome}:")
+            print(f"  gravação: {lancamentos / duracao:,.0f} transações/s ({tamanho / lancamentos:.1f} bytes/lançamento)")
+            print(f"  recuperação de {lancamentos:,} lançamentos: {recuperacao:.2f} s")
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
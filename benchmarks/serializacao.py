@@ -0,0 +1,70 @@
+# Compara a serialização de uma página de 10 mil atletas pelo caminho padrão
+# do FastAPI (validação do response_model + jsonable_encoder + json.dumps) com o
+# caminho rápido de ?fast=true (dicts vindos do banco direto no orjson).
+#
+# Uso: python benchmarks/serializacao.py [linhas] [repeticoes]
+import datetime
+import json
+import os
+import sys
+import timeit
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi_pagination import Page
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from desafio_fastAPI import Atleta
+
+
+def gerar_pagina(linhas):
+    categoria = {"id": 1, "nome": "Scale"}
+    centro = {"id": 1, "nome": "CT King", "endereco": "Rua X, 10", "proprietario": "Marcos"}
+    agora = datetime.datetime(2024, 1, 1, 12, 0, 0)
+    itens = [
+        {
+            "id": i,
+            "nome": f"Atleta {i}",
+            "cpf": f"{i:011d}",
+            "idade": 20 + i % 30,
+            "peso": 60 + i % 40,
+            "altura": 160 + i % 40,
+            "sexo": "F" if i % 2 else "M",
+            "centro_de_treinamento_id": 1,
+            "categoria_id": 1,
+            "data_insercao": agora,
+            "categoria": categoria,
+            "centro_de_treinamento": centro,
+        }
+        for i in range(linhas)
+    ]
+    return {"items": itens, "total": linhas, "page": 1, "size": linhas, "pages": 1}
+
+
+def caminho_padrao(pagina):
+    validada = Page[Atleta].parse_obj(pagina)
+    return json.dumps(
+        jsonable_encoder(validada), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def caminho_rapido(pagina):
+    return orjson.dumps(pagina)
+
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    pagina = gerar_pagina(linhas)
+    assert json.loads(caminho_padrao(pagina)) == json.loads(caminho_rapido(pagina))
+    padrao = min(timeit.repeat(lambda: caminho_padrao(pagina), number=1, repeat=repeticoes))
+    rapido = min(timeit.repeat(lambda: caminho_rapido(pagina), number=1, repeat=repeticoes))
+    print(f"{linhas} linhas por resposta")
+    print(f"  padrão (pydantic + json): {padrao * 1000:8.1f} ms  {linhas / padrao:12,.0f} linhas/s")
+    print(f"  rápido (orjson):          {rapido * 1000:8.1f} ms  {linhas / rapido:12,.0f} linhas/s")
+    print(f"  ganho: {padrao / rapido:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
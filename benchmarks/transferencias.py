@@ -0,0 +1,80 @@
+# Benchmark de transferências em lote do sistema_bancario_poo.
+#
+# Monta um lote de transferências aleatórias com chaves de idempotência,
+# mede a vazão de transferir_lote, reenvia o mesmo lote (todas as chaves já
+# vistas, nada pode ser lançado de novo) e confere que o dinheiro total das
+# contas não mudou. Com um diretório, mede também com o diário (WAL) ativo.
+#
+# Uso: python benchmarks/transferencias.py [transferencias] [contas] [diretorio]
+#      python benchmarks/transferencias.py 100000 10000
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import persistencia_bancaria
+import sistema_bancario_poo as banco
+
+
+def preparar_contas(quantidade):
+    banco.registro = banco.Registro()
+    banco.chaves_transferencia = banco.ChavesIdempotencia()
+    banco.criar_usuario("Benchmark", "01/01/2000", "00000000000", "Rua Teste, 1")
+    for _ in range(quantidade):
+        banco.criar_conta_corrente("00000000000")
+    banco.processar_lote((numero, "D", 100_000) for numero in range(1, quantidade + 1))
+
+
+def gerar_lote(transferencias, contas, prefixo):
+    aleatorio = random.Random(42)
+    return [
+        (f"{prefixo}-{i}", aleatorio.randint(1, contas), aleatorio.randint(1, contas), aleatorio.randint(100, 5_000))
+        for i in range(transferencias)
+    ]
+
+
+def medir(lote):
+    inicio = time.perf_counter()
+    resultados = banco.transferir_lote(lote)
+    if banco.persistencia is not None:
+        banco.persistencia.diario.sincronizar()
+    return time.perf_counter() - inicio, resultados
+
+
+def executar(rotulo, transferencias, contas):
+    preparar_contas(contas)
+    total_inicial = sum(conta.saldo for conta in banco.registro.contas.values())
+    lote = gerar_lote(transferencias, contas, rotulo)
+    duracao, resultados = medir(lote)
+    aceitas = resultados.count(banco.ACEITA)
+    lancamentos = sum(len(conta.historico) for conta in banco.registro.contas.values())
+    duracao_repeticao, repetidos = medir(lote)
+    assert repetidos == resultados, "reenvio com as mesmas chaves mudou o resultado"
+    assert sum(len(conta.historico) for conta in banco.registro.contas.values()) == lancamentos, "reenvio lançou de novo"
+    total_final = sum(conta.saldo for conta in banco.registro.contas.values())
+    assert total_final == total_inicial, f"dinheiro criado ou perdido: {total_final - total_inicial}"
+    print(f"{rotulo}: {transferencias:,} transferências, {aceitas:,} aceitas")
+    print(f"  lote:      {duracao:8.3f} s  {transferencias / duracao:12,.0f} transferências/s")
+    print(f"  reenvio:   {duracao_repeticao:8.3f} s  {transferencias / duracao_repeticao:12,.0f} transferências/s (idempotente)")
+
+
+def main():
+    transferencias = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    contas = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    executar("memoria", transferencias, contas)
+    diretorio = sys.argv[3] if len(sys.argv) > 3 else tempfile.mkdtemp(prefix="transferencias-")
+    try:
+        persistencia_bancaria.ativar(diretorio, snapshot_a_cada=10**18)
+        executar("diario", transferencias, contas)
+    finally:
+        persistencia_bancaria.desativar()
+        if len(sys.argv) <= 3:
+            shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
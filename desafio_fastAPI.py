@@ -1,11 +1,27 @@
-from fastapi import FastAPI, Depends, HTTPException
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, DateTime
+import csv
+import io
+import json
+import math
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Generic, List, Literal, Optional, TypeVar
+import orjson
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy import create_engine, event, func, literal, null, select, union_all, Column, Integer, String, ForeignKey, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship, Session
 from sqlalchemy.exc import IntegrityError
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+from pydantic.generics import GenericModel
 from datetime import datetime
-from fastapi_pagination import Page, add_pagination, paginate
+from fastapi_pagination import Page, Params, add_pagination
+from fastapi_pagination.ext.sqlalchemy import paginate
 
 #### Database Configuration ####
 
@@ -15,21 +31,187 @@ engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+#### Query Instrumentation ####
+
+# Conta os comandos SQL enviados ao banco enquanto o bloco estiver ativo.
+# Uso em testes:
+#     with QueryCounter() as queries:
+#         client.get("/atletas/")
+#     assert queries.count <= 3
+class QueryCounter:
+    def __init__(self, bind=engine):
+        self.bind = bind
+        self.statements = []
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.bind, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.bind, "before_cursor_execute", self._before_cursor_execute)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+#### Request Metrics ####
+
+# Latência por rota e tempo de banco por requisição, expostos em /metrics no
+# formato texto do Prometheus. O middleware guarda um RequestStats por
+# requisição num ContextVar e os eventos do SQLAlchemy somam nele a
+# quantidade e a duração dos comandos; o Starlette copia o contexto para o
+# threadpool das rotas síncronas, então o tempo de banco cai na rota certa.
+# O que sobra da latência é validação, serialização e a própria rota.
+# Os histogramas têm buckets fixos e a rota é o template (/atletas/{id}),
+# não o caminho, então a memória não cresce com o tráfego.
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def render(self, name, labels=""):
+        prefix = labels + "," if labels else ""
+        lines = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {total}')
+        total += self.counts[-1]
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {total}')
+        labels = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{labels} {self.sum}")
+        lines.append(f"{name}_count{labels} {total}")
+        return lines
+
+class RequestStats:
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.responses = {}
+        self.routes = {}
+        self.statement_time = Histogram(LATENCY_BUCKETS)
+
+    def observe_request(self, method, route, status, seconds, stats):
+        key = (method, route)
+        with self._lock:
+            self.responses[key + (status,)] = self.responses.get(key + (status,), 0) + 1
+            histograms = self.routes.get(key)
+            if histograms is None:
+                histograms = self.routes[key] = (
+                    Histogram(LATENCY_BUCKETS), Histogram(LATENCY_BUCKETS), Histogram(STATEMENT_BUCKETS)
+                )
+            latency, db_time, statements = histograms
+            latency.observe(seconds)
+            db_time.observe(stats.db_seconds)
+            statements.observe(stats.statements)
+
+    def observe_statement(self, seconds):
+        with self._lock:
+            self.statement_time.observe(seconds)
+
+    def render(self) -> str:
+        with self._lock:
+            lines = ["# TYPE http_requests_total counter"]
+            for (method, route, status), count in sorted(self.responses.items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+            families = (
+                ("http_request_duration_seconds", 0),
+                ("http_request_db_seconds", 1),
+                ("http_request_db_statements", 2),
+            )
+            for name, position in families:
+                lines.append(f"# TYPE {name} histogram")
+                for (method, route), histograms in sorted(self.routes.items()):
+                    lines.extend(histograms[position].render(name, f'method="{method}",route="{route}"'))
+            lines.append("# TYPE db_statement_duration_seconds histogram")
+            lines.extend(self.statement_time.render("db_statement_duration_seconds"))
+        lines.append("")
+        return "\n".join(lines)
+
+# Middleware ASGI puro: não cria Request nem envolve o corpo da resposta, só
+# observa o status e mede o tempo até o fim do envio.
+class MetricsMiddleware:
+    def __init__(self, app, registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            seconds = time.perf_counter() - start
+            current_request_stats.reset(token)
+            route = scope.get("route")
+            route = route.path if route is not None else "unmatched"
+            self.registry.observe_request(scope["method"], route, status, seconds, stats)
+
+def instrument_engine(bind, registry):
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context.metrics_start = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - context.metrics_start
+        registry.observe_statement(seconds)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += seconds
+
+    event.listen(bind, "before_cursor_execute", before_cursor_execute)
+    event.listen(bind, "after_cursor_execute", after_cursor_execute)
+
+request_metrics = MetricsRegistry()
+instrument_engine(engine, request_metrics)
+
 #### Models ####
 
-class Categoria(Base):
+class CategoriaModel(Base):
     __tablename__ = "categorias"
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String, index=True)
 
-class CentroDeTreinamento(Base):
+class CentroDeTreinamentoModel(Base):
     __tablename__ = "centros_de_treinamento"
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String, index=True)
     endereco = Column(String)
     proprietario = Column(String)
 
-class Atleta(Base):
+class AtletaModel(Base):
     __tablename__ = "atletas"
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String, index=True)
@@ -42,8 +224,8 @@ class Atleta(Base):
     categoria_id = Column(Integer, ForeignKey('categorias.id'))
     data_insercao = Column(DateTime, default=datetime.utcnow)
 
-    centro_de_treinamento = relationship("CentroDeTreinamento")
-    categoria = relationship("Categoria")
+    centro_de_treinamento = relationship("CentroDeTreinamentoModel")
+    categoria = relationship("CategoriaModel")
 
 #### Schemas ####
 
@@ -95,9 +277,16 @@ class Atleta(AtletaBase):
     class Config:
         orm_mode = True
 
+T = TypeVar("T")
+
+class CursorPage(GenericModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[int] = None
+
 #### FastAPI Application and Routers ####
 
 app = FastAPI()
+app.add_middleware(MetricsMiddleware, registry=request_metrics)
 
 Base.metadata.create_all(bind=engine)
 
@@ -110,55 +299,387 @@ def get_db():
     finally:
         db.close()
 
+#### Reference Cache ####
+
+# Cache em memória com TTL e descarte LRU para as tabelas de referência
+# (categorias e centros de treinamento), que mudam pouco e são lidas em toda
+# resposta de atleta. Escritas nessas tabelas limpam o cache correspondente.
+class TTLCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[1] < time.monotonic():
+                self._data.pop(key, None)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "size": len(self._data),
+        }
+
+categoria_cache = TTLCache()
+centro_cache = TTLCache()
+
+def split_cached(cache: TTLCache, ids):
+    found, missing = {}, []
+    for id in ids:
+        value = cache.get(id)
+        if value is None:
+            missing.append(id)
+        else:
+            found[id] = value
+    return found, missing
+
+# Carrega numa única consulta (UNION ALL) as categorias e os centros que
+# faltam no cache, para uma página fria custar no máximo três comandos:
+# contagem, página e referências.
+def load_references(db: Session, categoria_ids, centro_ids):
+    categorias, missing_categorias = split_cached(categoria_cache, categoria_ids)
+    centros, missing_centros = split_cached(centro_cache, centro_ids)
+    queries = []
+    if missing_categorias:
+        queries.append(
+            select(literal("categoria").label("tabela"), CategoriaModel.id, CategoriaModel.nome,
+                   null().label("endereco"), null().label("proprietario"))
+            .where(CategoriaModel.id.in_(missing_categorias))
+        )
+    if missing_centros:
+        queries.append(
+            select(literal("centro").label("tabela"), CentroDeTreinamentoModel.id, CentroDeTreinamentoModel.nome,
+                   CentroDeTreinamentoModel.endereco, CentroDeTreinamentoModel.proprietario)
+            .where(CentroDeTreinamentoModel.id.in_(missing_centros))
+        )
+    if queries:
+        query = union_all(*queries) if len(queries) > 1 else queries[0]
+        for tabela, id, nome, endereco, proprietario in db.execute(query):
+            if tabela == "categoria":
+                categorias[id] = Categoria(id=id, nome=nome)
+                categoria_cache.set(id, categorias[id])
+            else:
+                centros[id] = CentroDeTreinamento(id=id, nome=nome, endereco=endereco, proprietario=proprietario)
+                centro_cache.set(id, centros[id])
+    return categorias, centros
+
+# Monta a resposta dos atletas com categoria e centro de treinamento vindos
+# do cache; só os ids ausentes do cache geram uma consulta (uma para as duas
+# tabelas). Aceita objetos ORM ou linhas do Core; com as_dict=True as
+# referências já saem como dict, prontas para o caminho rápido de
+# serialização.
+def with_references(db: Session, atletas, as_dict: bool = False):
+    categorias, centros = load_references(db, {a.categoria_id for a in atletas},
+                                          {a.centro_de_treinamento_id for a in atletas})
+    if as_dict:
+        categorias = {id: categoria.dict() for id, categoria in categorias.items()}
+        centros = {id: centro.dict() for id, centro in centros.items()}
+    return [
+        {
+            **{column.name: getattr(atleta, column.name) for column in AtletaModel.__table__.columns},
+            "categoria": categorias.get(atleta.categoria_id),
+            "centro_de_treinamento": centros.get(atleta.centro_de_treinamento_id),
+        }
+        for atleta in atletas
+    ]
+
+#### Pagination helpers ####
+
+# Paginação por cursor (keyset) no id: a consulta parte do último id visto
+# em vez de usar OFFSET, então páginas profundas custam o mesmo que a primeira.
+def paginate_by_cursor(db: Session, query, model, after: int, limit: int, transformer=None):
+    query = query.where(model.id > after).order_by(model.id).limit(limit + 1)
+    items = db.execute(query).scalars().all()
+    next_cursor = items[limit - 1].id if len(items) > limit else None
+    items = items[:limit]
+    if transformer is not None:
+        items = transformer(items)
+    return CursorPage(items=items, next_cursor=next_cursor)
+
+#### Fast Serialization ####
+
+# Caminho opcional (?fast=true) para listas grandes: as linhas vêm do banco
+# como tuplas do Core, sem instanciar objetos ORM nem validar de novo contra o
+# response_model, e a resposta é codificada direto com orjson.
+def fast_page(db: Session, query, params: Params):
+    total = db.execute(select(func.count()).select_from(query.subquery())).scalar_one()
+    offset = (params.page - 1) * params.size
+    rows = db.execute(query.order_by(AtletaModel.id).offset(offset).limit(params.size)).all()
+    return ORJSONResponse({
+        "items": with_references(db, rows, as_dict=True),
+        "total": total,
+        "page": params.page,
+        "size": params.size,
+        "pages": math.ceil(total / params.size) if params.size else 0,
+    })
+
+def fast_cursor_page(db: Session, query, after: int, limit: int):
+    rows = db.execute(query.where(AtletaModel.id > after).order_by(AtletaModel.id).limit(limit + 1)).all()
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return ORJSONResponse({"items": with_references(db, rows[:limit], as_dict=True), "next_cursor": next_cursor})
+
+def cached_page(cache: TTLCache, key, load):
+    page = cache.get(key)
+    if page is None:
+        page = load()
+        cache.set(key, page)
+    return page
+
 #### Routers ####
 
 @app.post("/categorias/", response_model=Categoria)
 def create_categoria(categoria: CategoriaCreate, db: Session = Depends(get_db)):
-    db_categoria = Categoria(nome=categoria.nome)
+    db_categoria = CategoriaModel(nome=categoria.nome)
     db.add(db_categoria)
     db.commit()
     db.refresh(db_categoria)
+    categoria_cache.invalidate()
     return db_categoria
 
 @app.get("/categorias/", response_model=Page[Categoria])
-def read_categorias(db: Session = Depends(get_db)):
-    categorias = db.query(Categoria).all()
-    return paginate(categorias)
+def read_categorias(params: Params = Depends(), db: Session = Depends(get_db)):
+    return cached_page(categoria_cache, ("page", params.page, params.size),
+                       lambda: paginate(db, select(CategoriaModel).order_by(CategoriaModel.id), params))
+
+@app.get("/categorias/cursor/", response_model=CursorPage[Categoria])
+def read_categorias_cursor(after: int = 0, limit: int = Query(50, ge=1, le=500), db: Session = Depends(get_db)):
+    return cached_page(categoria_cache, ("cursor", after, limit),
+                       lambda: paginate_by_cursor(db, select(CategoriaModel), CategoriaModel, after, limit))
 
 @app.post("/centros_de_treinamento/", response_model=CentroDeTreinamento)
 def create_centro_de_treinamento(centro: CentroDeTreinamentoCreate, db: Session = Depends(get_db)):
-    db_centro = CentroDeTreinamento(**centro.dict())
+    db_centro = CentroDeTreinamentoModel(**centro.dict())
     db.add(db_centro)
     db.commit()
     db.refresh(db_centro)
+    centro_cache.invalidate()
     return db_centro
 
 @app.get("/centros_de_treinamento/", response_model=Page[CentroDeTreinamento])
-def read_centros(db: Session = Depends(get_db)):
-    centros = db.query(CentroDeTreinamento).all()
-    return paginate(centros)
+def read_centros(params: Params = Depends(), db: Session = Depends(get_db)):
+    return cached_page(centro_cache, ("page", params.page, params.size),
+                       lambda: paginate(db, select(CentroDeTreinamentoModel).order_by(CentroDeTreinamentoModel.id), params))
+
+@app.get("/centros_de_treinamento/cursor/", response_model=CursorPage[CentroDeTreinamento])
+def read_centros_cursor(after: int = 0, limit: int = Query(50, ge=1, le=500), db: Session = Depends(get_db)):
+    return cached_page(centro_cache, ("cursor", after, limit),
+                       lambda: paginate_by_cursor(db, select(CentroDeTreinamentoModel), CentroDeTreinamentoModel, after, limit))
+
+def select_atletas(nome: Optional[str] = None, cpf: Optional[str] = None, entity=AtletaModel):
+    query = select(entity)
+    if nome:
+        query = query.where(AtletaModel.nome == nome)
+    if cpf:
+        query = query.where(AtletaModel.cpf == cpf)
+    return query
 
 @app.post("/atletas/", response_model=Atleta)
 def create_atleta(atleta: AtletaCreate, db: Session = Depends(get_db)):
     try:
-        db_atleta = Atleta(**atleta.dict())
+        db_atleta = AtletaModel(**atleta.dict())
         db.add(db_atleta)
         db.commit()
-        db.refresh(db_atleta)
-        return db_atleta
     except IntegrityError:
         db.rollback()
         raise HTTPException(status_code=303, detail=f"Já existe um atleta cadastrado com o CPF: {atleta.cpf}!")
+    return with_references(db, [db_atleta])[0]
 
 @app.get("/atletas/", response_model=Page[Atleta])
-def read_atletas(nome: str = None, cpf: str = None, db: Session = Depends(get_db)):
-    query = db.query(Atleta)
-    if nome:
-        query = query.filter(Atleta.nome == nome)
-    if cpf:
-        query = query.filter(Atleta.cpf == cpf)
-    atletas = query.all()
-    return paginate(atletas)
+def read_atletas(nome: str = None, cpf: str = None, fast: bool = False,
+                 params: Params = Depends(), db: Session = Depends(get_db)):
+    if fast:
+        return fast_page(db, select_atletas(nome, cpf, AtletaModel.__table__), params)
+    return paginate(db, select_atletas(nome, cpf).order_by(AtletaModel.id), params,
+                    transformer=lambda atletas: with_references(db, atletas))
+
+@app.get("/atletas/cursor/", response_model=CursorPage[Atleta])
+def read_atletas_cursor(nome: str = None, cpf: str = None, after: int = 0, fast: bool = False,
+                        limit: int = Query(50, ge=1, le=500), db: Session = Depends(get_db)):
+    if fast:
+        return fast_cursor_page(db, select_atletas(nome, cpf, AtletaModel.__table__), after, limit)
+    return paginate_by_cursor(db, select_atletas(nome, cpf), AtletaModel, after, limit,
+                              transformer=lambda atletas: with_references(db, atletas))
+
+@app.get("/cache/metrics/")
+def read_cache_metrics():
+    return {"categorias": categoria_cache.stats(), "centros_de_treinamento": centro_cache.stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    return PlainTextResponse(request_metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+#### Export ####
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = [column.name for column in AtletaModel.__table__.columns]
+
+# As linhas são lidas do banco em partições de EXPORT_BATCH_SIZE (yield_per
+# com cursor no servidor) e enviadas assim que cada partição fica pronta.
+# A sessão é aberta pelo próprio gerador porque ele roda depois do fim da
+# função da rota.
+def iter_atletas_export(format: str, nome: Optional[str], cpf: Optional[str]):
+    db = SessionLocal()
+    try:
+        query = select_atletas(nome, cpf, AtletaModel.__table__).order_by(AtletaModel.id)
+        result = db.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            yield buffer.getvalue()
+            for partition in result.partitions():
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(partition)
+                yield buffer.getvalue()
+        else:
+            for partition in result.partitions():
+                yield b"".join(orjson.dumps(row._asdict()) + b"\n" for row in partition)
+    finally:
+        db.close()
+
+@app.get("/atletas/export")
+def export_atletas(format: Literal["ndjson", "csv"] = "ndjson", nome: str = None, cpf: str = None):
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        iter_atletas_export(format, nome, cpf),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=atletas.{format}"},
+    )
+
+#### Bulk Import ####
+
+# Tamanho de cada lote; fica abaixo do limite de 999 parâmetros do SQLite
+# na consulta de CPFs existentes.
+IMPORT_CHUNK_SIZE = 500
+
+async def iter_import_rows(request: Request):
+    if request.headers.get("content-type", "").startswith("application/json"):
+        rows = json.loads(await request.body())
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="O corpo JSON deve ser um array de atletas.")
+        for line_number, row in enumerate(rows, start=1):
+            yield line_number, row
+        return
+    line_number = 0
+    pending = b""
+    async for data in request.stream():
+        pending += data
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+    if pending.strip():
+        yield line_number + 1, pending
+
+# O lote traz as linhas na ordem da entrada, as inválidas com atleta None,
+# para os resultados saírem na mesma ordem.
+def insert_atletas_chunk(db: Session, chunk, seen_cpfs: set):
+    cpfs = [cpf for _, atleta, cpf in chunk if atleta is not None]
+    existing = set()
+    if cpfs:
+        existing = set(db.execute(select(AtletaModel.cpf).where(AtletaModel.cpf.in_(cpfs))).scalars())
+    rows, results = [], []
+    for line_number, atleta, cpf in chunk:
+        if atleta is None:
+            results.append((line_number, cpf, "invalido"))
+            continue
+        if atleta.cpf in existing or atleta.cpf in seen_cpfs:
+            results.append((line_number, atleta.cpf, "cpf_duplicado"))
+            continue
+        seen_cpfs.add(atleta.cpf)
+        rows.append(atleta.dict())
+        results.append((line_number, atleta.cpf, "inserido"))
+    if rows:
+        db.execute(AtletaModel.__table__.insert(), rows)
+    return results
+
+# Guarda o NDJSON dos resultados enquanto a importação roda: até
+# IMPORT_SPOOL_SIZE bytes fica em memória, acima disso vai para um arquivo
+# temporário, então a memória não cresce com o tamanho da lista.
+IMPORT_SPOOL_SIZE = 1024 * 1024
+
+class ImportResults:
+    def __init__(self):
+        self.summary = {"inserido": 0, "cpf_duplicado": 0, "invalido": 0}
+        self.file = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE)
+
+    def extend(self, results):
+        lines = []
+        for line_number, cpf, status in results:
+            self.summary[status] += 1
+            lines.append(orjson.dumps({"linha": line_number, "cpf": cpf, "status": status}) + b"\n")
+        self.file.write(b"".join(lines))
+
+    def __iter__(self):
+        try:
+            self.file.seek(0)
+            while block := self.file.read(64 * 1024):
+                yield block
+            yield orjson.dumps({"resumo": self.summary}) + b"\n"
+        finally:
+            self.file.close()
+
+# Importação em massa de atletas: aceita um array JSON ou NDJSON (um
+# AtletaCreate por linha). Cada lote faz uma única consulta de CPFs já
+# cadastrados e um INSERT com executemany; tudo roda em uma só transação.
+# A resposta é NDJSON com o resultado de cada linha e um resumo no final, e
+# só começa depois do commit: antes dele nenhum "inserido" é definitivo.
+@app.post("/atletas/import/")
+async def import_atletas(request: Request):
+    results = ImportResults()
+    seen_cpfs = set()
+    chunk = []
+    db = SessionLocal()
+    try:
+        async for line_number, row in iter_import_rows(request):
+            try:
+                atleta = AtletaCreate.parse_raw(row) if isinstance(row, bytes) else AtletaCreate.parse_obj(row)
+                chunk.append((line_number, atleta, atleta.cpf))
+            except ValidationError:
+                chunk.append((line_number, None, row.get("cpf") if isinstance(row, dict) else None))
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                results.extend(await run_in_threadpool(insert_atletas_chunk, db, chunk, seen_cpfs))
+                chunk = []
+        if chunk:
+            results.extend(await run_in_threadpool(insert_atletas_chunk, db, chunk, seen_cpfs))
+        await run_in_threadpool(db.commit)
+    except json.JSONDecodeError:
+        await run_in_threadpool(db.rollback)
+        results.file.close()
+        raise HTTPException(status_code=400, detail="Corpo da requisição não é um JSON válido.")
+    except Exception:
+        await run_in_threadpool(db.rollback)
+        results.file.close()
+        raise
+    finally:
+        db.close()
+    return StreamingResponse(iter(results), media_type="application/x-ndjson")
 
 #### Pagination Configuration ####
 
@@ -1,9 +1,271 @@
 ###### database.py ######
+import os
+import threading
+from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, monitoring
+from .metrics import command_metrics
+
+MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
+
+# Configuração do pool de conexões; ajuste maxPoolSize conforme o número de
+# workers (cada processo uvicorn tem o seu próprio pool).
+MONGODB_SETTINGS = {
+    "maxPoolSize": int(os.getenv("MONGODB_MAX_POOL_SIZE", "100")),
+    "minPoolSize": int(os.getenv("MONGODB_MIN_POOL_SIZE", "10")),
+    "maxIdleTimeMS": int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000")),
+    "waitQueueTimeoutMS": int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "5000")),
+    "connectTimeoutMS": int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "5000")),
+    "serverSelectionTimeoutMS": int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+    "socketTimeoutMS": int(os.getenv("MONGODB_SOCKET_TIMEOUT_MS", "30000")),
+    "compressors": os.getenv("MONGODB_COMPRESSORS", "zlib"),
+}
+
+# Listener de eventos do pool: conexões abertas, em uso e requisições
+# aguardando uma conexão livre.
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.created = 0
+        self.closed = 0
+        self.checkout_started = 0
+        self.checked_out = 0
+        self.checked_in = 0
+        self.checkout_failed = 0
+
+    def _add(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._add("created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add("closed")
+
+    def connection_check_out_started(self, event):
+        self._add("checkout_started")
+
+    def connection_check_out_failed(self, event):
+        self._add("checkout_failed")
+
+    def connection_checked_out(self, event):
+        self._add("checked_out")
+
+    def connection_checked_in(self, event):
+        self._add("checked_in")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "max_pool_size": MONGODB_SETTINGS["maxPoolSize"],
+                "open_connections": self.created - self.closed,
+                "checked_out": self.checked_out - self.checked_in,
+                "wait_queue_size": self.checkout_started - self.checked_out - self.checkout_failed,
+                "checkout_failures": self.checkout_failed,
+                "total_checkouts": self.checked_out,
+            }
+
+pool_metrics = PoolMetrics()
+client: Optional[AsyncIOMotorClient] = None
+product_collection = None
+
+# O cliente é criado no lifespan da aplicação e fechado no shutdown.
+# Retorna True se uma nova conexão foi aberta.
+def connect() -> bool:
+    global client, product_collection
+    if client is not None:
+        return False
+    client = AsyncIOMotorClient(MONGODB_URL, event_listeners=[pool_metrics, command_metrics], **MONGODB_SETTINGS)
+    product_collection = client.store_db.get_collection("products")
+    return True
+
+def close():
+    global client, product_collection
+    if client is not None:
+        client.close()
+    client = None
+    product_collection = None
+
+def get_product_collection():
+    if product_collection is None:
+        raise RuntimeError("Banco de dados não conectado")
+    return product_collection
+
+# Índices usados pelo filtro de preço: (price, _id) atende a paginação por
+# cursor, (status, price, _id) o filtro por status e created_at as listagens
+# por data de criação. O índice único e esparso em external_id atende os
+# upserts do ingest (sem ele cada linha do feed varre a coleção) e impede que
+# dois lotes em voo com o mesmo identificador criem produtos duplicados; os
+# produtos criados pela API, sem external_id, ficam fora dele.
+PRODUCT_INDEXES = [
+    IndexModel([("external_id", ASCENDING)], name="external_id", unique=True, sparse=True),
+    IndexModel([("price", ASCENDING), ("_id", ASCENDING)], name="price_id"),
+    IndexModel([("status", ASCENDING), ("price", ASCENDING), ("_id", ASCENDING)], name="status_price_id"),
+    IndexModel([("created_at", DESCENDING)], name="created_at"),
+]
+
+async def create_indexes():
+    await get_product_collection().create_indexes(PRODUCT_INDEXES)
+
+###### metrics.py ######
+import threading
+import time
+from bisect import bisect_left
+from pymongo import monitoring
+
+# Métricas no formato texto do Prometheus para /metrics: latência por rota
+# (medida por um middleware ASGI puro) e comandos enviados ao MongoDB
+# (CommandListener do pymongo, registrado no cliente junto com o
+# PoolMetrics). Os histogramas têm buckets fixos e a rota é o template
+# (/products/{product_id}), então a memória não cresce com o tráfego e o
+# custo por requisição fica em poucos microssegundos.
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def render(self, name, labels=""):
+        prefix = labels + "," if labels else ""
+        lines = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {total}')
+        total += self.counts[-1]
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {total}')
+        labels = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{labels} {self.sum}")
+        lines.append(f"{name}_count{labels} {total}")
+        return lines
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.responses = {}
+        self.latency = {}
+
+    def observe(self, method, route, status, seconds):
+        key = (method, route)
+        with self._lock:
+            self.responses[key + (status,)] = self.responses.get(key + (status,), 0) + 1
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram()
+            histogram.observe(seconds)
+
+    def render(self):
+        with self._lock:
+            lines = ["# TYPE http_requests_total counter"]
+            for (method, route, status), count in sorted(self.responses.items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+            lines.append("# TYPE http_request_duration_seconds histogram")
+            for (method, route), histogram in sorted(self.latency.items()):
+                lines.extend(histogram.render("http_request_duration_seconds", f'method="{method}",route="{route}"'))
+        return lines
+
+# Os eventos chegam das threads do driver; a duração vem do próprio pymongo.
+class CommandMetrics(monitoring.CommandListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.failures = {}
+        self.duration = {}
+
+    def _observe(self, event):
+        histogram = self.duration.get(event.command_name)
+        if histogram is None:
+            histogram = self.duration[event.command_name] = Histogram()
+        histogram.observe(event.duration_micros / 1_000_000)
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        with self._lock:
+            self._observe(event)
 
-client = AsyncIOMotorClient('mongodb://localhost:27017')
-database = client.store_db
-product_collection = database.get_collection("products")
+    def failed(self, event):
+        with self._lock:
+            self._observe(event)
+            self.failures[event.command_name] = self.failures.get(event.command_name, 0) + 1
+
+    def render(self):
+        with self._lock:
+            lines = ["# TYPE mongodb_command_duration_seconds histogram"]
+            for command, histogram in sorted(self.duration.items()):
+                lines.extend(histogram.render("mongodb_command_duration_seconds", f'command="{command}"'))
+            lines.append("# TYPE mongodb_command_failures_total counter")
+            for command, count in sorted(self.failures.items()):
+                lines.append(f'mongodb_command_failures_total{{command="{command}"}} {count}')
+        return lines
+
+class MetricsMiddleware:
+    def __init__(self, app, registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            seconds = time.perf_counter() - start
+            route = scope.get("route")
+            route = route.path if route is not None else "unmatched"
+            self.registry.observe(scope["method"], route, status, seconds)
+
+def render_pool(snapshot: dict):
+    lines = []
+    for key in ("max_pool_size", "open_connections", "checked_out", "wait_queue_size"):
+        lines.append(f"# TYPE mongodb_pool_{key} gauge")
+        lines.append(f"mongodb_pool_{key} {snapshot[key]}")
+    lines.append("# TYPE mongodb_pool_checkout_failures_total counter")
+    lines.append(f"mongodb_pool_checkout_failures_total {snapshot['checkout_failures']}")
+    lines.append("# TYPE mongodb_pool_checkouts_total counter")
+    lines.append(f"mongodb_pool_checkouts_total {snapshot['total_checkouts']}")
+    return lines
+
+request_metrics = RequestMetrics()
+command_metrics = CommandMetrics()
+
+def render(pool_snapshot: dict) -> str:
+    lines = request_metrics.render() + command_metrics.render() + render_pool(pool_snapshot)
+    lines.append("")
+    return "\n".join(lines)
 
 ###### models.py ######
 from typing import Optional
@@ -19,6 +281,14 @@ class Product(BaseModel):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
+    @classmethod
+    def from_mongo(cls, document: dict):
+        return cls(id=str(document.pop("_id")), **document)
+
+class ProductPage(BaseModel):
+    items: list[Product]
+    next_cursor: Optional[str] = None
+
 ###### schemas.py ######
 from pydantic import BaseModel
 from typing import Optional
@@ -35,64 +305,404 @@ class ProductUpdate(BaseModel):
     price: Optional[float] = None
     status: Optional[str] = None
 
+class ProductBatchUpdate(ProductUpdate):
+    id: str
+
+class BatchUpdateResult(BaseModel):
+    matched_count: int
+    modified_count: int
+
+class IngestFailure(BaseModel):
+    line: int
+    error: str
+
+class IngestReport(BaseModel):
+    processed: int = 0
+    inserted: int = 0
+    upserted: int = 0
+    modified: int = 0
+    failed: int = 0
+    failures: list[IngestFailure] = []
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
+
 ###### crud.py ######
-from .database import product_collection
-from .models import Product
-from .schemas import ProductCreate, ProductUpdate
+from typing import Optional
+from .database import get_product_collection
+from .models import Product, ProductPage
+from .schemas import ProductCreate, ProductUpdate, ProductBatchUpdate, BatchUpdateResult
 from bson import ObjectId
 from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+
+PRODUCT_PROJECTION = {field: 1 for field in Product.__fields__ if field != "id"}
+
+# O cursor de paginação é "<price>:<_id>" do último item da página; a próxima
+# página continua a partir dele pelo índice (price, _id), sem usar skip.
+def encode_cursor(document: dict) -> str:
+    return f"{document['price']!r}:{document['_id']}"
+
+def decode_cursor(cursor: str):
+    try:
+        price, product_id = cursor.split(":", 1)
+        return float(price), ObjectId(product_id)
+    except Exception:
+        raise ValueError("Cursor inválido")
+
+def new_product_document(product: ProductCreate) -> dict:
+    now = datetime.utcnow()
+    return {**product.dict(), "created_at": now, "updated_at": now}
+
+def update_document(product: ProductUpdate) -> dict:
+    update_data = {k: v for k, v in product.dict(exclude={"id"}).items() if v is not None}
+    update_data["updated_at"] = datetime.utcnow()
+    return update_data
 
+# As escritas devolvem o documento gravado sem uma segunda ida ao banco: no
+# insert o documento já é montado aqui (o _id é preenchido pelo driver) e no
+# update o find_one_and_update retorna a versão atualizada.
 class CRUDProduct:
     @staticmethod
     async def create(product: ProductCreate):
-        product_data = product.dict()
-        product_data["created_at"] = datetime.utcnow()
-        product_data["updated_at"] = datetime.utcnow()
-        result = await product_collection.insert_one(product_data)
+        product_data = new_product_document(product)
+        result = await get_product_collection().insert_one(product_data)
         if result.inserted_id:
-            return await CRUDProduct.get(result.inserted_id)
+            return Product.from_mongo(product_data)
         else:
             raise Exception("Erro ao inserir o produto")
 
+    @staticmethod
+    async def create_many(products: list[ProductCreate]):
+        documents = [new_product_document(product) for product in products]
+        if documents:
+            await get_product_collection().insert_many(documents, ordered=False)
+        return [Product.from_mongo(document) for document in documents]
+
     @staticmethod
     async def get(product_id: str):
-        product = await product_collection.find_one({"_id": ObjectId(product_id)})
+        product = await get_product_collection().find_one({"_id": ObjectId(product_id)})
         if product:
-            return Product(**product)
+            return Product.from_mongo(product)
 
     @staticmethod
     async def update(product_id: str, product: ProductUpdate):
-        update_data = {k: v for k, v in product.dict().items() if v is not None}
-        update_data["updated_at"] = datetime.utcnow()
-        result = await product_collection.update_one(
-            {"_id": ObjectId(product_id)}, {"$set": update_data}
+        document = await get_product_collection().find_one_and_update(
+            {"_id": ObjectId(product_id)},
+            {"$set": update_document(product)},
+            projection=PRODUCT_PROJECTION,
+            return_document=ReturnDocument.AFTER,
         )
-        if result.modified_count == 1:
-            return await CRUDProduct.get(product_id)
+        if document:
+            return Product.from_mongo(document)
         else:
             raise Exception("Produto não encontrado")
 
     @staticmethod
-    async def filter_by_price(min_price: float, max_price: float):
-        products = await product_collection.find(
-            {"price": {"$gt": min_price, "$lt": max_price}}
-        ).to_list(100)
-        return [Product(**product) for product in products]
+    async def update_many(products: list[ProductBatchUpdate]):
+        operations = [
+            UpdateOne({"_id": ObjectId(product.id)}, {"$set": update_document(product)})
+            for product in products
+        ]
+        if not operations:
+            return BatchUpdateResult(matched_count=0, modified_count=0)
+        result = await get_product_collection().bulk_write(operations, ordered=False)
+        return BatchUpdateResult(matched_count=result.matched_count, modified_count=result.modified_count)
+
+    @staticmethod
+    async def find_by_price(min_price: float, max_price: float, status: Optional[str] = None,
+                            sort: str = "asc", after: Optional[str] = None, limit: int = 100):
+        query = {"price": {"$gt": min_price, "$lt": max_price}}
+        if status is not None:
+            query["status"] = status
+        direction, operator = (ASCENDING, "$gt") if sort == "asc" else (DESCENDING, "$lt")
+        if after is not None:
+            last_price, last_id = decode_cursor(after)
+            query["$or"] = [
+                {"price": {operator: last_price}},
+                {"price": last_price, "_id": {operator: last_id}},
+            ]
+        cursor = (
+            get_product_collection().find(query, PRODUCT_PROJECTION)
+            .sort([("price", direction), ("_id", direction)])
+            .limit(limit + 1)
+            .batch_size(limit + 1)
+        )
+        documents = []
+        async for document in cursor:
+            documents.append(document)
+        next_cursor = encode_cursor(documents[limit - 1]) if len(documents) > limit else None
+        return documents[:limit], next_cursor
+
+    @staticmethod
+    async def filter_by_price(min_price: float, max_price: float, status: Optional[str] = None,
+                              sort: str = "asc", after: Optional[str] = None, limit: int = 100):
+        documents, next_cursor = await CRUDProduct.find_by_price(min_price, max_price, status, sort, after, limit)
+        return ProductPage(
+            items=[Product.from_mongo(document) for document in documents],
+            next_cursor=next_cursor,
+        )
+
+    # Versão sem pydantic para o caminho rápido: os documentos saem como dict,
+    # só com o _id convertido para o campo id.
+    @staticmethod
+    async def filter_by_price_raw(min_price: float, max_price: float, status: Optional[str] = None,
+                                  sort: str = "asc", after: Optional[str] = None, limit: int = 100):
+        documents, next_cursor = await CRUDProduct.find_by_price(min_price, max_price, status, sort, after, limit)
+        for document in documents:
+            document["id"] = str(document.pop("_id"))
+        return {"items": documents, "next_cursor": next_cursor}
+
+    # Percorre a coleção inteira com um cursor assíncrono; o driver busca os
+    # documentos em lotes de batch_size conforme o consumidor avança.
+    @staticmethod
+    async def iter_all(status: Optional[str] = None, batch_size: int = 1000):
+        query = {} if status is None else {"status": status}
+        cursor = get_product_collection().find(query, PRODUCT_PROJECTION).sort("_id", ASCENDING).batch_size(batch_size)
+        async for document in cursor:
+            document["id"] = str(document.pop("_id"))
+            yield document
 
     @staticmethod
     async def delete(product_id: str):
-        result = await product_collection.delete_one({"_id": ObjectId(product_id)})
+        result = await get_product_collection().delete_one({"_id": ObjectId(product_id)})
         if result.deleted_count == 1:
             return True
         return False
 
+###### ingest.py ######
+import asyncio
+import csv
+import json
+import time
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from bson.errors import InvalidId
+from bson import ObjectId
+from pydantic import ValidationError
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from .database import get_product_collection
+from .schemas import ProductCreate, ProductUpdate, IngestFailure, IngestReport
+from .crud import update_document
+
+# Limita quantas falhas são guardadas no relatório; as demais só são contadas,
+# para a memória não crescer com o tamanho do feed.
+MAX_REPORTED_FAILURES = 1000
+
+# Devolve as linhas físicas ainda em bytes: a decodificação fica com iter_rows,
+# para um byte inválido virar falha só da sua linha.
+async def iter_lines(chunks: AsyncIterator[bytes]):
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+# Um único csv.reader lê as linhas à medida que elas chegam, então campos entre
+# aspas podem conter quebras de linha. O reader só é chamado quando as linhas
+# pendentes fecham todas as aspas: sem mais linhas ele encerraria o campo
+# aberto no meio.
+class CsvRecords:
+    def __init__(self):
+        self.lines = deque()
+        self.quotes = 0
+        self.reader = csv.reader(self)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+    @property
+    def pending(self) -> bool:
+        return bool(self.lines)
+
+    def feed(self, line: str) -> Optional[list[str]]:
+        self.lines.append(line + "\n")
+        self.quotes += line.count('"')
+        if self.quotes % 2:
+            return None
+        self.quotes = 0
+        return next(self.reader)
+
+    def discard(self):
+        self.lines.clear()
+        self.quotes = 0
+
+# Cada registro é identificado pela linha física onde começa.
+async def iter_rows(lines: AsyncIterator[bytes], format: str):
+    header = None
+    records = CsvRecords() if format == "csv" else None
+    line_number = start = 0
+    async for line in lines:
+        line_number += 1
+        if records is None or not records.pending:
+            start = line_number
+        try:
+            line = line.decode("utf-8").rstrip("\r")
+            if records is None:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError("a linha deve ser um objeto JSON")
+            else:
+                if not records.pending and not line.strip():
+                    continue
+                values = records.feed(line)
+                if values is None:
+                    continue
+                if header is None:
+                    header = values
+                    continue
+                row = {key: value or None for key, value in zip(header, values)}
+        except (ValueError, csv.Error) as e:
+            if records is not None:
+                records.discard()
+            yield start, None, e
+            continue
+        yield start, row, None
+    if records is not None and records.pending:
+        records.discard()
+        yield start, None, ValueError("registro CSV com aspas sem fechamento")
+
+# Linhas com "id" atualizam o produto existente (ProductUpdate). Linhas com
+# "external_id" (o identificador do produto no sistema de origem do feed) são
+# upserts por ele, preservando o created_at original; as demais são inserções
+# (ProductCreate), como no POST /products/.
+def build_operation(row: dict):
+    if row.get("id"):
+        product = ProductUpdate.parse_obj(row)
+        return UpdateOne({"_id": ObjectId(row["id"])}, {"$set": update_document(product)})
+    product = ProductCreate.parse_obj(row)
+    now = datetime.utcnow()
+    external_id = row.get("external_id")
+    if not external_id:
+        return InsertOne({**product.dict(), "created_at": now, "updated_at": now})
+    if not isinstance(external_id, str):
+        raise TypeError("external_id deve ser texto")
+    return UpdateOne(
+        {"external_id": external_id},
+        {"$set": {**product.dict(), "updated_at": now}, "$setOnInsert": {"created_at": now}},
+        upsert=True,
+    )
+
+class ProductIngestor:
+    def __init__(self, batch_size: int = 1000, max_in_flight: int = 4):
+        self.batch_size = batch_size
+        self.report = IngestReport()
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._tasks = set()
+
+    def _fail(self, line: int, error):
+        self.report.failed += 1
+        if len(self.report.failures) < MAX_REPORTED_FAILURES:
+            self.report.failures.append(IngestFailure(line=line, error=str(error)))
+
+    async def _write(self, lines: list[int], operations: list):
+        try:
+            result = await get_product_collection().bulk_write(operations, ordered=False)
+            self.report.inserted += result.inserted_count
+            self.report.upserted += result.upserted_count
+            self.report.modified += result.modified_count
+        except BulkWriteError as e:
+            self.report.inserted += e.details.get("nInserted", 0)
+            self.report.upserted += e.details.get("nUpserted", 0)
+            self.report.modified += e.details.get("nModified", 0)
+            for error in e.details.get("writeErrors", []):
+                self._fail(lines[error["index"]], error.get("errmsg"))
+        # A task sai de _tasks assim que termina, então qualquer outra falha
+        # precisa ser contada aqui para as linhas do lote não sumirem do
+        # relatório.
+        except Exception as e:
+            for line in lines:
+                self._fail(line, e)
+        finally:
+            self._slots.release()
+
+    # Espera um espaço livre antes de criar o próximo lote: com todos os lotes
+    # em voo, a leitura do feed fica parada até algum bulk_write terminar.
+    async def _submit(self, lines: list[int], operations: list):
+        await self._slots.acquire()
+        task = asyncio.create_task(self._write(lines, operations))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def run(self, rows) -> IngestReport:
+        start = time.perf_counter()
+        lines, operations = [], []
+        async for line, row, error in rows:
+            self.report.processed += 1
+            if error is None:
+                try:
+                    operations.append(build_operation(row))
+                    lines.append(line)
+                except (ValidationError, InvalidId, TypeError) as e:
+                    error = e
+            if error is not None:
+                self._fail(line, error)
+                continue
+            if len(operations) >= self.batch_size:
+                await self._submit(lines, operations)
+                lines, operations = [], []
+        if operations:
+            await self._submit(lines, operations)
+        await asyncio.gather(*self._tasks)
+        self.report.elapsed_seconds = time.perf_counter() - start
+        if self.report.elapsed_seconds:
+            self.report.rows_per_second = self.report.processed / self.report.elapsed_seconds
+        return self.report
+
+async def ingest(chunks: AsyncIterator[bytes], format: str = "ndjson",
+                 batch_size: int = 1000, max_in_flight: int = 4) -> IngestReport:
+    ingestor = ProductIngestor(batch_size, max_in_flight)
+    return await ingestor.run(iter_rows(iter_lines(chunks), format))
+
 ###### main.py ######
-from fastapi import FastAPI, HTTPException
-from .schemas import ProductCreate, ProductUpdate
+import csv
+import io
+from contextlib import asynccontextmanager
+from typing import Literal, Optional
+import orjson
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
+from . import database, metrics
+from bson.errors import InvalidId
+from pymongo.errors import BulkWriteError
+from .schemas import ProductCreate, ProductUpdate, ProductBatchUpdate, BatchUpdateResult, IngestReport
 from .crud import CRUDProduct
-from .models import Product
+from .ingest import ingest
+from .models import Product, ProductPage
+
+# Abre o pool já no startup (ping + minPoolSize) para a primeira requisição
+# não pagar o custo de conexão, e fecha o cliente no shutdown.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    connected = database.connect()
+    if connected:
+        await database.client.admin.command("ping")
+    await database.create_indexes()
+    yield
+    if connected:
+        database.close()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(metrics.MetricsMiddleware, registry=metrics.request_metrics)
+
+@app.get("/metrics/pool")
+async def pool_metrics():
+    return database.pool_metrics.snapshot()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(database.pool_metrics.snapshot()), media_type=metrics.PROMETHEUS_CONTENT_TYPE)
 
 @app.post("/products/", response_model=Product)
 async def create_product(product: ProductCreate):
@@ -101,6 +711,62 @@ async def create_product(product: ProductCreate):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/products/batch/", response_model=list[Product])
+async def create_products(products: list[ProductCreate]):
+    try:
+        return await CRUDProduct.create_many(products)
+    except BulkWriteError as e:
+        raise HTTPException(status_code=400, detail=e.details.get("writeErrors"))
+
+@app.patch("/products/batch/", response_model=BatchUpdateResult)
+async def update_products(products: list[ProductBatchUpdate]):
+    try:
+        return await CRUDProduct.update_many(products)
+    except InvalidId as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# O corpo (NDJSON ou CSV com cabeçalho) é lido em streaming direto da requisição.
+@app.post("/products/ingest/", response_model=IngestReport)
+async def ingest_products(request: Request, format: Literal["ndjson", "csv"] = "ndjson",
+                          batch_size: int = Query(1000, ge=1, le=10000),
+                          max_in_flight: int = Query(4, ge=1, le=64)):
+    return await ingest(request.stream(), format, batch_size, max_in_flight)
+
+EXPORT_COLUMNS = list(Product.__fields__)
+
+async def iter_products_export(format: str, status: Optional[str], batch_size: int = 1000):
+    if format == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        rows = 0
+        async for document in CRUDProduct.iter_all(status, batch_size):
+            writer.writerow(document)
+            rows += 1
+            if rows % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        lines = []
+        async for document in CRUDProduct.iter_all(status, batch_size):
+            lines.append(orjson.dumps(document))
+            if len(lines) == batch_size:
+                yield b"\n".join(lines) + b"\n"
+                lines = []
+        if lines:
+            yield b"\n".join(lines) + b"\n"
+
+@app.get("/products/export")
+async def export_products(format: Literal["ndjson", "csv"] = "ndjson", status: Optional[str] = None):
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        iter_products_export(format, status),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=products.{format}"},
+    )
+
 @app.patch("/products/{product_id}", response_model=Product)
 async def update_product(product_id: str, product: ProductUpdate):
     try:
@@ -108,9 +774,46 @@ async def update_product(product_id: str, product: ProductUpdate):
     except Exception as e:
         raise HTTPException(status_code=404, detail="Produto não encontrado")
 
-@app.get("/products/filter/", response_model=list[Product])
-async def filter_products(min_price: float, max_price: float):
-    return await CRUDProduct.filter_by_price(min_price, max_price)
+@app.get("/products/filter/", response_model=ProductPage)
+async def filter_products(min_price: float, max_price: float, status: Optional[str] = None,
+                          sort: Literal["asc", "desc"] = "asc", after: Optional[str] = None,
+                          limit: int = Query(100, ge=1, le=1000), fast: bool = False):
+    try:
+        if fast:
+            # Os documentos vêm do próprio banco: pula a validação do
+            # response_model e codifica direto com orjson.
+            page = await CRUDProduct.filter_by_price_raw(min_price, max_price, status, sort, after, limit)
+            return ORJSONResponse(page)
+        return await CRUDProduct.filter_by_price(min_price, max_price, status, sort, after, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+###### tests/conftest.py ######
+import os
+import pytest
+
+# Sem MONGODB_URL definido, os testes usam o mongomock-motor em memória no
+# lugar de um mongod local; o mesmo cliente vale para a sessão inteira, como
+# aconteceria com um banco real.
+@pytest.fixture(scope="session")
+def mongo_client():
+    if os.getenv("MONGODB_URL"):
+        yield None
+        return
+    from mongomock_motor import AsyncMongoMockClient
+    yield AsyncMongoMockClient()
+
+@pytest.fixture(autouse=True)
+def product_collection(monkeypatch, mongo_client):
+    from .. import database
+    if mongo_client is None:
+        database.connect()
+        yield database.get_product_collection()
+        database.close()
+        return
+    monkeypatch.setattr(database, "client", mongo_client)
+    monkeypatch.setattr(database, "product_collection", mongo_client.store_db.get_collection("products"))
+    yield database.product_collection
 
 ###### tests/test_crud.py ######
 import pytest
@@ -135,7 +838,83 @@ async def test_update_product():
 async def test_filter_products():
     await CRUDProduct.create(ProductCreate(name="Product3", quantity=7, price=7000, status="Available"))
     products = await CRUDProduct.filter_by_price(5000, 8000)
-    assert len(products) > 0
+    assert len(products.items) > 0
+
+@pytest.mark.asyncio
+async def test_filter_products_pagination():
+    for price in (9001, 9002, 9003):
+        await CRUDProduct.create(ProductCreate(name=f"Paged{price}", quantity=1, price=price, status="Available"))
+    first_page = await CRUDProduct.filter_by_price(9000, 9004, limit=2)
+    assert [product.price for product in first_page.items] == [9001, 9002]
+    second_page = await CRUDProduct.filter_by_price(9000, 9004, limit=2, after=first_page.next_cursor)
+    assert [product.price for product in second_page.items] == [9003]
+    assert second_page.next_cursor is None
+
+###### tests/test_ingest.py ######
+import pytest
+from ..database import create_indexes, get_product_collection
+from ..ingest import ingest
+
+async def feed(*lines: str):
+    for line in lines:
+        yield (line + "\n").encode("utf-8")
+
+@pytest.mark.asyncio
+async def test_ingest_ndjson_upserts_and_reports_failures():
+    await create_indexes()
+    report = await ingest(feed(
+        '{"external_id": "feed-1", "name": "Feed1", "quantity": 1, "price": 10, "status": "Available"}',
+        '{"external_id": "feed-1", "name": "Feed1", "quantity": 2, "price": 12, "status": "Available"}',
+        '{"external_id": "feed-2", "name": "Feed2", "quantity": "muitos", "price": 10, "status": "Available"}',
+        'isto não é json',
+    ), batch_size=1)
+    assert report.processed == 4
+    assert report.upserted == 1
+    assert report.modified == 1
+    assert [failure.line for failure in report.failures] == [3, 4]
+
+@pytest.mark.asyncio
+async def test_ingest_without_external_id_inserts_like_the_api():
+    await create_indexes()
+    report = await ingest(feed(
+        '{"name": "Feed4", "quantity": 1, "price": 10, "status": "Available"}',
+        '{"name": "Feed4", "quantity": 2, "price": 12, "status": "Available"}',
+    ))
+    assert report.inserted == 2
+    assert report.failed == 0
+    assert await get_product_collection().count_documents({"name": "Feed4"}) == 2
+
+@pytest.mark.asyncio
+async def test_ingest_reports_lines_that_are_not_objects():
+    report = await ingest(feed("5", "null", "[]", '{"name": "Feed3", "quantity": 1, "price": 10, "status": "Available"}'))
+    assert report.processed == 4
+    assert report.inserted == 1
+    assert [failure.line for failure in report.failures] == [1, 2, 3]
+
+@pytest.mark.asyncio
+async def test_ingest_decodes_and_parses_each_row():
+    async def chunks():
+        yield b'name,quantity,price,status\n"Csv,4",1,10,Available\n'
+        yield b'Csv\xff5,1,10,Available\n"Csv\n6",1,'
+        yield b'10,Available\n"Csv7,1,10,Available\n'
+    report = await ingest(chunks(), format="csv")
+    assert report.processed == 4
+    assert report.inserted == 2
+    assert [failure.line for failure in report.failures] == [3, 6]
+    assert await get_product_collection().count_documents({"name": {"$in": ["Csv,4", "Csv\n6"]}}) == 2
+
+@pytest.mark.asyncio
+async def test_ingest_csv():
+    report = await ingest(feed(
+        "external_id,name,quantity,price,status",
+        "csv-1,Csv1,3,30,Available",
+        "csv-2,Csv2,4,40,Available",
+        ",Csv3,5,50,Available",
+    ), format="csv")
+    assert report.processed == 3
+    assert report.upserted == 2
+    assert report.inserted == 1
+    assert report.failed == 0
 
 ###### tests/test_schemas.py ######
 from pydantic import ValidationError
@@ -150,24 +929,112 @@ def test_product_create_invalid():
         ProductCreate(name="Test", quantity=-5, price=-100, status="Available")
 
 ###### tests/test_controllers.py ######
+import pytest
 from fastapi.testclient import TestClient
 from ..main import app
+from ..models import Product
 
-client = TestClient(app)
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
 
-def test_create_product():
+def test_create_product(client):
     response = client.post("/products/", json={"name": "Test Product", "quantity": 10, "price": 1000, "status": "Available"})
     assert response.status_code == 200
     assert response.json()["name"] == "Test Product"
 
-def test_update_product():
+def test_update_product(client):
     create_response = client.post("/products/", json={"name": "Product4", "quantity": 8, "price": 4000, "status": "Available"})
     product_id = create_response.json()["id"]
     response = client.patch(f"/products/{product_id}", json={"price": 4500})
     assert response.status_code == 200
     assert response.json()["price"] == 4500
 
-def test_filter_products():
+def test_batch_create_and_update_products(client):
+    create_response = client.post("/products/batch/", json=[
+        {"name": "Batch1", "quantity": 1, "price": 100, "status": "Available"},
+        {"name": "Batch2", "quantity": 2, "price": 200, "status": "Available"},
+    ])
+    assert create_response.status_code == 200
+    ids = [product["id"] for product in create_response.json()]
+    response = client.patch("/products/batch/", json=[{"id": product_id, "price": 300} for product_id in ids])
+    assert response.status_code == 200
+    assert response.json() == {"matched_count": 2, "modified_count": 2}
+
+def test_filter_products(client):
+    response = client.get("/products/filter/?min_price=5000&max_price=8000")
+    assert response.status_code == 200
+    assert len(response.json()["items"]) > 0
+
+def test_filter_products_fast_path(client):
     response = client.get("/products/filter/?min_price=5000&max_price=8000")
+    fast_response = client.get("/products/filter/?min_price=5000&max_price=8000&fast=true")
+    assert fast_response.status_code == 200
+    assert [item["id"] for item in fast_response.json()["items"]] == [item["id"] for item in response.json()["items"]]
+
+def test_export_products(client):
+    client.post("/products/", json={"name": "Exported", "quantity": 1, "price": 10, "status": "Export"})
+    response = client.get("/products/export?status=Export")
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert len(lines) >= 1
+    assert all('"status":"Export"' in line for line in lines)
+    csv_response = client.get("/products/export?format=csv&status=Export")
+    assert csv_response.text.splitlines()[0] == ",".join(Product.__fields__)
+
+def test_filter_products_invalid_cursor(client):
+    response = client.get("/products/filter/?min_price=5000&max_price=8000&after=invalido")
+    assert response.status_code == 400
+
+def test_metrics_use_route_template(client):
+    create_response = client.post("/products/", json={"name": "Metrics", "quantity": 1, "price": 10, "status": "Available"})
+    client.patch(f"/products/{create_response.json()['id']}", json={"price": 20})
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/products/{product_id}",status="200"' in response.text
+    assert "http_request_duration_seconds_bucket" in response.text
+
+###### benchmarks/bench_products.py ######
+# Benchmarks HTTP do filtro por preço com pytest-benchmark; sem MONGODB_URL,
+# rodam contra o mongomock-motor, como os testes. Ver benchmarks/conftest.py
+# na raiz do repositório para gravar a base e comparar execuções.
+import os
+import pytest
+from fastapi.testclient import TestClient
+from .. import database
+from ..main import app
+
+PRODUCTS = 10_000
+BATCH_SIZE = 1_000
+
+@pytest.fixture(scope="module")
+def client():
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        if not os.getenv("MONGODB_URL"):
+            from mongomock_motor import AsyncMongoMockClient
+            mongo_client = AsyncMongoMockClient()
+            monkeypatch.setattr(database, "client", mongo_client)
+            monkeypatch.setattr(database, "product_collection", mongo_client.bench_db.get_collection("products"))
+        with TestClient(app) as client:
+            for start in range(0, PRODUCTS, BATCH_SIZE):
+                response = client.post("/products/batch/", json=[
+                    {"name": f"Bench{i}", "quantity": i % 100, "price": i % 10_000, "status": "Available"}
+                    for i in range(start, start + BATCH_SIZE)
+                ])
+                assert response.status_code == 200
+            yield client
+
+def bench_filter_by_price(benchmark, client):
+    response = benchmark(client.get, "/products/filter/?min_price=1000&max_price=5000&limit=100")
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 100
+
+def bench_filter_by_price_fast(benchmark, client):
+    response = benchmark(client.get, "/products/filter/?min_price=1000&max_price=5000&limit=100&fast=true")
+    assert response.status_code == 200
+
+def bench_filter_by_price_status(benchmark, client):
+    response = benchmark(client.get, "/products/filter/?min_price=1000&max_price=5000&status=Available&sort=desc&limit=100")
     assert response.status_code == 200
-    assert len(response.json()) > 0
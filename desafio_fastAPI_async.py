@@ -0,0 +1,136 @@
+import os
+
+from fastapi import FastAPI, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker, selectinload
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from fastapi_pagination import Page, add_pagination
+from fastapi_pagination.ext.sqlalchemy import paginate
+
+from desafio_fastAPI import (
+    Base,
+    CategoriaModel,
+    CentroDeTreinamentoModel,
+    AtletaModel,
+    Categoria,
+    CategoriaCreate,
+    CentroDeTreinamento,
+    CentroDeTreinamentoCreate,
+    Atleta,
+    AtletaCreate,
+    MetricsMiddleware,
+    MetricsRegistry,
+    PROMETHEUS_CONTENT_TYPE,
+    instrument_engine,
+)
+
+#### Async Database Configuration ####
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "sqlite+aiosqlite:///./test.db")
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# O pool é explícito porque o padrão do SQLAlchemy 1.4 para SQLite (NullPool)
+# não aceita os parâmetros de tamanho.
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
+    pool_timeout=POOL_TIMEOUT,
+    pool_recycle=POOL_RECYCLE,
+    pool_pre_ping=True,
+)
+AsyncSessionLocal = sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# Os eventos de cursor do SQLAlchemy são disparados pelo engine síncrono por
+# baixo do assíncrono, dentro da task da requisição.
+request_metrics = MetricsRegistry()
+instrument_engine(async_engine.sync_engine, request_metrics)
+
+#### FastAPI Application and Routers ####
+
+app = FastAPI()
+app.add_middleware(MetricsMiddleware, registry=request_metrics)
+
+@app.on_event("startup")
+async def startup():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+@app.on_event("shutdown")
+async def shutdown():
+    await async_engine.dispose()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def read_metrics():
+    return PlainTextResponse(request_metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+#### Dependency ####
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+#### Routers ####
+
+# Em sessões assíncronas não existe lazy loading implícito, por isso as
+# relações do atleta são carregadas junto com a consulta.
+def select_atletas():
+    return select(AtletaModel).options(
+        selectinload(AtletaModel.centro_de_treinamento),
+        selectinload(AtletaModel.categoria),
+    )
+
+@app.post("/categorias/", response_model=Categoria)
+async def create_categoria(categoria: CategoriaCreate, db: AsyncSession = Depends(get_db)):
+    db_categoria = CategoriaModel(nome=categoria.nome)
+    db.add(db_categoria)
+    await db.commit()
+    return db_categoria
+
+@app.get("/categorias/", response_model=Page[Categoria])
+async def read_categorias(db: AsyncSession = Depends(get_db)):
+    return await paginate(db, select(CategoriaModel).order_by(CategoriaModel.id))
+
+@app.post("/centros_de_treinamento/", response_model=CentroDeTreinamento)
+async def create_centro_de_treinamento(centro: CentroDeTreinamentoCreate, db: AsyncSession = Depends(get_db)):
+    db_centro = CentroDeTreinamentoModel(**centro.dict())
+    db.add(db_centro)
+    await db.commit()
+    return db_centro
+
+@app.get("/centros_de_treinamento/", response_model=Page[CentroDeTreinamento])
+async def read_centros(db: AsyncSession = Depends(get_db)):
+    return await paginate(db, select(CentroDeTreinamentoModel).order_by(CentroDeTreinamentoModel.id))
+
+@app.post("/atletas/", response_model=Atleta)
+async def create_atleta(atleta: AtletaCreate, db: AsyncSession = Depends(get_db)):
+    try:
+        db_atleta = AtletaModel(**atleta.dict())
+        db.add(db_atleta)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=303, detail=f"Já existe um atleta cadastrado com o CPF: {atleta.cpf}!")
+    return await db.scalar(select_atletas().where(AtletaModel.id == db_atleta.id))
+
+@app.get("/atletas/", response_model=Page[Atleta])
+async def read_atletas(nome: str = None, cpf: str = None, db: AsyncSession = Depends(get_db)):
+    query = select_atletas()
+    if nome:
+        query = query.where(AtletaModel.nome == nome)
+    if cpf:
+        query = query.where(AtletaModel.cpf == cpf)
+    return await paginate(db, query.order_by(AtletaModel.id))
+
+#### Pagination Configuration ####
+
+add_pagination(app)
@@ -1,37 +1,61 @@
 import datetime
 
-# Listas para armazenar usuários e contas
-usuarios = []
-contas = []
+import dinheiro
+
+# Registro com índices por CPF e por (agência, número da conta)
+class Registro:
+    def __init__(self):
+        self.usuarios = {}
+        self.contas = {}
+
+    def adicionar_usuario(self, usuario):
+        if usuario['cpf'] in self.usuarios:
+            return False
+        self.usuarios[usuario['cpf']] = usuario
+        return True
+
+    def buscar_usuario(self, cpf):
+        return self.usuarios.get(cpf)
+
+    def adicionar_conta(self, conta):
+        chave = (conta['agencia'], conta['numero_conta'])
+        if chave in self.contas:
+            return False
+        self.contas[chave] = conta
+        return True
+
+    def buscar_conta(self, agencia, numero_conta):
+        return self.contas.get((agencia, numero_conta))
+
+registro = Registro()
 
 # Funções utilitárias
 
 def buscar_usuario_por_cpf(cpf):
-    for usuario in usuarios:
-        if usuario['cpf'] == cpf:
-            return usuario
-    return None
+    return registro.buscar_usuario(cpf)
 
 # Funções de operações bancárias
 
-def sacar(*, saldo, valor, extrato, limite, numero_saques, limite_saques):
-    if numero_saques >= limite_saques:
+def sacar(*, saldo, valor, extrato, limite, saques_do_dia):
+    if saques_do_dia.quantidade_excedida():
         return saldo, extrato, "Operação não realizada, número de saques diários excedido."
     elif valor > limite:
         return saldo, extrato, "Não é possível realizar este saque, o limite por saque é de R$500."
     elif saldo >= valor:
         saldo -= valor
-        numero_saques += 1
-        extrato.append(f"Saque: R${valor:.2f} - {datetime.datetime.now()}")
-        return saldo, extrato, f"Saque de R${valor:.2f} realizado com sucesso!"
+        saques_do_dia.registrar(valor)
+        extrato.append(f"Saque: {dinheiro.formatar(valor)} - {datetime.datetime.now()}")
+        return saldo, extrato, f"Saque de {dinheiro.formatar(valor)} realizado com sucesso!"
     else:
         return saldo, extrato, "Saldo insuficiente!"
 
 def depositar(saldo, valor, extrato):
-    if valor > 0:
+    if valor > 0 and not dinheiro.cabe(saldo, valor):
+        return saldo, extrato, "Operação não realizada, o saldo ultrapassaria o máximo permitido."
+    elif valor > 0:
         saldo += valor
-        extrato.append(f"Depósito: R${valor:.2f} - {datetime.datetime.now()}")
-        return saldo, extrato, f"Depósito de R${valor:.2f} realizado com sucesso!"
+        extrato.append(f"Depósito: {dinheiro.formatar(valor)} - {datetime.datetime.now()}")
+        return saldo, extrato, f"Depósito de {dinheiro.formatar(valor)} realizado com sucesso!"
     else:
         return saldo, extrato, "Favor depositar apenas valores inteiros e positivos."
 
@@ -39,24 +63,19 @@ def exibir_extrato(saldo, *, extrato):
     if not extrato:
         return "Nenhuma movimentação realizada."
     else:
-        extrato_str = "Extrato:\n"
-        for transacao in extrato:
-            extrato_str += transacao + "\n"
-        extrato_str += f"\nSaldo atual: R${saldo:.2f}"
-        return extrato_str
+        return "\n".join(["Extrato:", *extrato, "", f"Saldo atual: {dinheiro.formatar(saldo)}"])
 
 # Funções para criar usuários e contas
 
 def criar_usuario(nome, data_nascimento, cpf, endereco):
-    if buscar_usuario_por_cpf(cpf) is not None:
-        return "Usuário com este CPF já cadastrado."
     usuario = {
         'nome': nome,
         'data_nascimento': data_nascimento,
         'cpf': cpf,
         'endereco': endereco
     }
-    usuarios.append(usuario)
+    if not registro.adicionar_usuario(usuario):
+        return "Usuário com este CPF já cadastrado."
     return "Usuário criado com sucesso!"
 
 def criar_conta_corrente(cpf):
@@ -64,23 +83,24 @@ def criar_conta_corrente(cpf):
     if usuario is None:
         return "Usuário não encontrado."
     agencia = "0001"
-    numero_conta = len(contas) + 1
+    numero_conta = len(registro.contas) + 1
     conta = {
         'agencia': agencia,
         'numero_conta': numero_conta,
         'usuario': usuario
     }
-    contas.append(conta)
+    if not registro.adicionar_conta(conta):
+        return "Conta já cadastrada."
     return f"Conta criada com sucesso! Agência: {agencia}, Número da conta: {numero_conta}"
 
 # Menu e fluxo principal
 
 def main():
+    # Valores em centavos (ver dinheiro.py)
     saldo = 0
-    limite_saque = 500
-    limite_diario_saque = 1500
-    numero_saques = 0
+    limite_saque = 50_000
     limite_saques_diarios = 3
+    saques_do_dia = dinheiro.LimiteDiario(limite_saques_diarios)
     extrato = []
 
     menu = """
@@ -100,21 +120,20 @@ def main():
 
         if opcao == "1":
             try:
-                valor = int(input("Digite o valor a ser depositado: "))
+                valor = dinheiro.centavos(input("Digite o valor a ser depositado: "))
                 saldo, extrato, msg = depositar(saldo, valor, extrato)
                 print(msg)
-            except ValueError:
+            except (ValueError, OverflowError):
                 print("Favor depositar apenas valores inteiros e positivos.")
         elif opcao == "2":
             try:
-                valor = int(input("Digite o valor a ser sacado: "))
+                valor = dinheiro.centavos(input("Digite o valor a ser sacado: "))
                 saldo, extrato, msg = sacar(
                     saldo=saldo, valor=valor, extrato=extrato,
-                    limite=limite_saque, numero_saques=numero_saques,
-                    limite_saques=limite_saques_diarios
+                    limite=limite_saque, saques_do_dia=saques_do_dia
                 )
                 print(msg)
-            except ValueError:
+            except (ValueError, OverflowError):
                 print("Favor sacar apenas valores inteiros e positivos.")
         elif opcao == "3":
             print(exibir_extrato(saldo, extrato=extrato))
@@ -0,0 +1,109 @@
+# Valores monetários em centavos inteiros.
+#
+# Saldos, limites e lançamentos dos módulos bancários são ints em centavos:
+# a aritmética é exata e tão barata quanto a de float. Os limites são os de
+# um inteiro de 64 bits com sinal, o mesmo tipo das colunas do Historico e
+# dos registros do diário, então um valor que passa por aqui sempre cabe
+# neles.
+import datetime
+
+MAXIMO = 2**63 - 1
+MINIMO = -(2**63)
+
+# Até LIMITE_FLOAT centavos em módulo, o erro de um float fica muito abaixo
+# de meio centavo: ler o texto com float() e arredondar, ou formatar
+# centavos / 100 com duas casas, dá sempre o valor exato, e é o caminho mais
+# rápido. Acima disso a conversão é feita só com inteiros.
+LIMITE_FLOAT = 2**45
+
+
+def verificar(centavos):
+    if not MINIMO <= centavos <= MAXIMO:
+        raise OverflowError(f"valor fora do intervalo permitido: {centavos} centavos")
+    return centavos
+
+
+def cabe(saldo, valor):
+    return MINIMO <= saldo + valor <= MAXIMO
+
+
+# Valor de uma operação: centavos inteiros e positivos. Float e bool são
+# recusados antes de tocar no saldo, porque as colunas do histórico só
+# aceitam int.
+def positivo(valor):
+    return type(valor) is int and valor > 0
+
+
+# Converte reais em centavos. Texto ("12", "12.5", "12,50") aceita no máximo
+# duas casas decimais; int é lido como reais inteiros; float é arredondado
+# para o centavo mais próximo.
+def centavos(valor):
+    if isinstance(valor, str):
+        numero = float(valor.replace(",", "."))
+        if -LIMITE_FLOAT < numero * 100 < LIMITE_FLOAT:
+            resultado = round(numero * 100)
+            if resultado / 100 != numero:
+                raise ValueError(f"valor monetário com mais de duas casas: {valor!r}")
+            return resultado
+        return _ler_texto(valor)
+    if isinstance(valor, bool):
+        raise TypeError("valor monetário inválido: bool")
+    if isinstance(valor, int):
+        return verificar(valor * 100)
+    return verificar(round(valor * 100))
+
+
+def _ler_texto(valor):
+    texto = valor.strip().replace(",", ".")
+    sinal = -1 if texto.startswith("-") else 1
+    inteiro, _, fracao = texto.lstrip("+-").partition(".")
+    if not (inteiro or fracao) or len(fracao) > 2 or not (inteiro + fracao).isdecimal():
+        raise ValueError(f"valor monetário inválido: {valor!r}")
+    return verificar(sinal * (int(inteiro or "0") * 100 + int(fracao.ljust(2, "0"))))
+
+
+def formatar_valor(centavos):
+    if -LIMITE_FLOAT < centavos < LIMITE_FLOAT:
+        return f"{centavos / 100:.2f}"
+    reais, resto = divmod(-centavos if centavos < 0 else centavos, 100)
+    return f"-{reais}.{resto:02d}" if centavos < 0 else f"{reais}.{resto:02d}"
+
+
+def formatar(centavos):
+    if -LIMITE_FLOAT < centavos < LIMITE_FLOAT:
+        return f"R${centavos / 100:.2f}"
+    return "R$" + formatar_valor(centavos)
+
+
+# Controle dos saques do dia, usado pelos três sistemas bancários: guarda a
+# quantidade e o total sacado no dia corrente e zera os contadores na virada
+# do dia, sem precisar percorrer o histórico. O limite de valor é opcional.
+class LimiteDiario:
+    __slots__ = ("limite_quantidade", "limite_valor", "dia", "quantidade", "total")
+
+    def __init__(self, limite_quantidade, limite_valor=None):
+        self.limite_quantidade = limite_quantidade
+        self.limite_valor = limite_valor
+        self.dia = None
+        self.quantidade = 0
+        self.total = 0
+
+    def _virar_dia(self):
+        hoje = datetime.date.today()
+        if hoje != self.dia:
+            self.dia = hoje
+            self.quantidade = 0
+            self.total = 0
+
+    def quantidade_excedida(self):
+        self._virar_dia()
+        return self.quantidade >= self.limite_quantidade
+
+    def valor_excedido(self, valor):
+        self._virar_dia()
+        return self.limite_valor is not None and self.total + valor > self.limite_valor
+
+    def registrar(self, valor):
+        self._virar_dia()
+        self.quantidade += 1
+        self.total += valor
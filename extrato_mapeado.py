@@ -0,0 +1,110 @@
+# Extrato em arquivo mapeado em memória para o sistema_bancario_poo.
+#
+# Cada conta ganha um arquivo com registros de largura fixa (tipo, valor em
+# centavos e data em segundos desde a época). Como todo registro tem o mesmo
+# tamanho, o deslocamento do lançamento i é simplesmente i * REGISTRO.size, e
+# uma página ou um período do extrato é lido direto do mapa, sem carregar o
+# histórico inteiro na memória do processo. O arquivo cresce dobrando de
+# capacidade, então gravar um lançamento é só escrever no mapa.
+#
+# O arquivo é área de trabalho, não cópia de segurança: ele começa vazio a
+# cada execução. A durabilidade continua sendo papel do persistencia_bancaria,
+# que reconstrói o histórico pelo snapshot e pelo diário.
+#
+# Uso:
+#     import extrato_mapeado
+#     extrato_mapeado.ativar("extratos/")
+import mmap
+import os
+import struct
+from array import array
+
+import sistema_bancario_poo as banco
+
+REGISTRO = struct.Struct("<bqq")
+DATA = struct.Struct("<q")
+DESLOCAMENTO_DATA = struct.calcsize("<bq")
+CAPACIDADE_INICIAL = 4096
+
+
+# Visão só das datas do arquivo, para a busca binária de Historico.intervalo.
+class DatasMapeadas:
+    def __init__(self, historico):
+        self.historico = historico
+
+    def __len__(self):
+        return self.historico.total
+
+    def __getitem__(self, indice):
+        return DATA.unpack_from(self.historico.mapa, indice * REGISTRO.size + DESLOCAMENTO_DATA)[0]
+
+
+class HistoricoMapeado(banco.Historico):
+    def __init__(self, conta=None, caminho=None, capacidade=CAPACIDADE_INICIAL):
+        self.conta = conta
+        self.caminho = caminho
+        self.arquivo = open(caminho, "w+b")
+        self.total = 0
+        self.capacidade = 0
+        self.mapa = None
+        self._crescer(capacidade)
+        self.iniciar_saldos()
+
+    def _crescer(self, capacidade):
+        if self.mapa is not None:
+            self.mapa.close()
+        self.arquivo.truncate(capacidade * REGISTRO.size)
+        self.mapa = mmap.mmap(self.arquivo.fileno(), capacidade * REGISTRO.size)
+        self.capacidade = capacidade
+
+    def __len__(self):
+        return self.total
+
+    def __iter__(self):
+        tipos = self.TIPOS
+        for codigo, centavos, data in REGISTRO.iter_unpack(self.mapa[: self.total * REGISTRO.size]):
+            yield tipos[codigo], centavos, data
+
+    @property
+    def datas(self):
+        return DatasMapeadas(self)
+
+    def registro(self, indice):
+        if not -self.total <= indice < self.total:
+            raise IndexError("lançamento fora do extrato")
+        return REGISTRO.unpack_from(self.mapa, (indice % self.total) * REGISTRO.size)
+
+    def colunas(self):
+        tipos, valores, datas = array("b"), array("q"), array("q")
+        for codigo, centavos, data in REGISTRO.iter_unpack(self.mapa[: self.total * REGISTRO.size]):
+            tipos.append(codigo)
+            valores.append(centavos)
+            datas.append(data)
+        return tipos, valores, datas
+
+    def gravar(self, codigo, centavos, data):
+        if self.total == self.capacidade:
+            self._crescer(self.capacidade * 2)
+        REGISTRO.pack_into(self.mapa, self.total * REGISTRO.size, codigo, centavos, data)
+        self.total += 1
+        self.indexar(codigo, centavos, data)
+
+    def fechar(self):
+        self.mapa.close()
+        self.arquivo.truncate(self.total * REGISTRO.size)
+        self.arquivo.close()
+
+
+def ativar(diretorio, capacidade=CAPACIDADE_INICIAL):
+    os.makedirs(diretorio, exist_ok=True)
+
+    def fabrica(conta):
+        caminho = os.path.join(diretorio, f"{conta.agencia}-{conta.numero}.ext")
+        return HistoricoMapeado(conta, caminho, capacidade)
+
+    banco.fabrica_historico = fabrica
+    return fabrica
+
+
+def desativar():
+    banco.fabrica_historico = banco.Historico
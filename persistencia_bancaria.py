@@ -0,0 +1,399 @@
+# Persistência do sistema_bancario_poo: diário de escrita antecipada (WAL)
+# binário com group commit e snapshots compactos.
+#
+# Cada cliente, conta e lançamento criado no sistema_bancario_poo vira um
+# registro no diário, e a operação só retorna depois do fsync que cobre o seu
+# registro. O fsync é compartilhado: quem chega enquanto outro fsync está em
+# andamento espera por ele e depois grava de uma vez tudo o que acumulou
+# (group commit). Dentro de confirmacao_em_lote (processar_lote,
+# transferir_lote) a espera acontece uma vez só, no fim do lote; enquanto
+# isso uma thread grava os pendentes a cada `lote` registros ou `intervalo`
+# segundos.
+#
+# De tempos em tempos um snapshot com o estado completo é gravado e um novo
+# arquivo de diário é iniciado; na recuperação o snapshot é carregado e só os
+# diários posteriores a ele são reaplicados.
+#
+# Uso:
+#     import persistencia_bancaria
+#     persistencia_bancaria.ativar("dados/")
+import contextlib
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+
+import sistema_bancario_poo as banco
+
+# Tipos de registro do diário. CLIENTE_SEPARADO é o formato antigo dos
+# clientes (campos unidos por SEPARADOR), só lido na recuperação.
+CLIENTE_SEPARADO = 1
+CONTA = 2
+LANCAMENTO = 3
+GRUPO = 4
+CLIENTE = 5
+
+# Cada registro: crc32 do conteúdo, tamanho do conteúdo, tipo, conteúdo
+CABECALHO = struct.Struct("<IIB")
+LANCAMENTO_FORMATO = struct.Struct("<4sqbqq")
+CONTA_FORMATO = struct.Struct("<4sqqq")
+# Campos de texto: tamanho em bytes seguido do texto em UTF-8, então qualquer
+# caractere pode aparecer num nome ou endereço.
+CAMPO = struct.Struct("<I")
+SEPARADOR = "\x1f"
+
+ARQUIVO_SNAPSHOT = "snapshot.bin"
+
+
+def empacotar(tipo, conteudo):
+    return CABECALHO.pack(zlib.crc32(conteudo), len(conteudo), tipo) + conteudo
+
+
+def empacotar_campos(*campos):
+    partes = []
+    for campo in campos:
+        dados = campo.encode("utf-8")
+        partes.append(CAMPO.pack(len(dados)))
+        partes.append(dados)
+    return b"".join(partes)
+
+
+def desempacotar_campos(conteudo):
+    campos = []
+    posicao = 0
+    while posicao < len(conteudo):
+        (tamanho,) = CAMPO.unpack_from(conteudo, posicao)
+        posicao += CAMPO.size
+        campos.append(conteudo[posicao:posicao + tamanho].decode("utf-8"))
+        posicao += tamanho
+    return campos
+
+
+def nome_diario(geracao):
+    return f"diario.{geracao:08d}.wal"
+
+
+class DiarioTransacoes:
+    def __init__(self, caminho, lote=1000, intervalo=0.005):
+        self.caminho = caminho
+        self.lote = lote
+        self.intervalo = intervalo
+        self.arquivo = open(caminho, "ab")
+        self.pendentes = []
+        self.grupo = None
+        self.profundidade = 0
+        self.registros = 0
+        self.sincronizados = 0
+        # trava protege os registros pendentes; trava_arquivo serializa as
+        # gravações. Quando as duas são necessárias, trava_arquivo vem antes.
+        self.trava = threading.RLock()
+        self.trava_arquivo = threading.RLock()
+        self.sinal = threading.Condition(self.trava)
+        self.ativo = True
+        self.gravador = threading.Thread(target=self._gravar_periodicamente, daemon=True)
+        self.gravador.start()
+
+    def anexar(self, tipo, conteudo):
+        registro = empacotar(tipo, conteudo)
+        with self.trava:
+            if self.grupo is not None:
+                self.grupo.append(registro)
+                return
+            self.pendentes.append(registro)
+            self.registros += 1
+            if len(self.pendentes) >= self.lote:
+                self.sinal.notify()
+
+    # Registros anexados dentro do bloco vão para o disco como um único
+    # registro GRUPO: na recuperação ou entram todos, ou nenhum.
+    @contextlib.contextmanager
+    def atomico(self):
+        with self.trava:
+            self.profundidade += 1
+            if self.grupo is None:
+                self.grupo = []
+            try:
+                yield
+            finally:
+                self.profundidade -= 1
+                if self.profundidade == 0:
+                    registros, self.grupo = self.grupo, None
+                    if registros:
+                        self.anexar(GRUPO, b"".join(registros))
+
+    # O fsync acontece fora da trava dos pendentes, então as operações
+    # continuam sendo anexadas enquanto o lote anterior vai para o disco.
+    # Com `ate`, não faz nada se o fsync de outra thread já cobriu os `ate`
+    # primeiros registros.
+    def sincronizar(self, ate=None):
+        with self.trava_arquivo:
+            with self.trava:
+                if self.arquivo.closed or (ate is not None and self.sincronizados >= ate):
+                    return
+                lote, self.pendentes = self.pendentes, []
+                ultimo = self.registros
+            if lote:
+                self.arquivo.write(b"".join(lote))
+            self.arquivo.flush()
+            os.fsync(self.arquivo.fileno())
+            with self.trava:
+                self.sincronizados = ultimo
+
+    # Espera até que tudo o que já foi anexado esteja no disco. Não pode ser
+    # chamado com a trava dos pendentes (ou dentro de atomico).
+    def confirmar(self):
+        with self.trava:
+            ate = self.registros
+        self.sincronizar(ate)
+
+    def _gravar_periodicamente(self):
+        while True:
+            with self.trava:
+                if not self.ativo:
+                    return
+                self.sinal.wait(self.intervalo)
+                pendentes = bool(self.pendentes)
+            if pendentes:
+                self.sincronizar()
+
+    def fechar(self):
+        with self.trava:
+            self.ativo = False
+            self.sinal.notify()
+        self.gravador.join()
+        with self.trava_arquivo:
+            self.sincronizar()
+            self.arquivo.close()
+
+
+# Percorre os registros íntegros de um diário. Para cada um devolve o tipo, o
+# conteúdo e a posição onde ele termina; para na primeira falha de CRC ou
+# registro incompleto.
+def ler_registros(dados):
+    posicao = 0
+    while posicao + CABECALHO.size <= len(dados):
+        crc, tamanho, tipo = CABECALHO.unpack_from(dados, posicao)
+        inicio = posicao + CABECALHO.size
+        conteudo = dados[inicio:inicio + tamanho]
+        if len(conteudo) < tamanho or zlib.crc32(conteudo) != crc:
+            return
+        posicao = inicio + tamanho
+        if tipo == GRUPO:
+            for subtipo, subconteudo, _ in ler_registros(conteudo):
+                yield subtipo, subconteudo, posicao
+        else:
+            yield tipo, conteudo, posicao
+
+
+class Persistencia:
+    def __init__(self, diretorio, lote=1000, intervalo=0.005, snapshot_a_cada=1_000_000):
+        self.diretorio = diretorio
+        self.lote = lote
+        self.intervalo = intervalo
+        self.snapshot_a_cada = snapshot_a_cada
+        self.geracao = 0
+        self.diario = None
+        self.tirando_snapshot = threading.Lock()
+        self.local = threading.local()
+
+    # Dentro do bloco, os ganchos só anexam; a espera pelo fsync fica para a
+    # saída do bloco mais externo da thread. Um diário trocado por um
+    # snapshot no meio do lote já foi sincronizado na troca.
+    # Com esperar=False a saída não espera: quem chamou recebe a função de
+    # confirmação e a executa depois, por exemplo fora do event loop.
+    @contextlib.contextmanager
+    def em_lote(self, esperar=True):
+        self.local.lotes = getattr(self.local, "lotes", 0) + 1
+        try:
+            yield self.confirmar
+        finally:
+            self.local.lotes -= 1
+            if esperar and not self.local.lotes:
+                self.confirmar()
+
+    # Lê self.diario na hora: o lote pode ter terminado num diário novo.
+    def confirmar(self):
+        self.diario.confirmar()
+
+    def _confirmar(self):
+        if not getattr(self.local, "lotes", 0):
+            self.diario.confirmar()
+
+    @contextlib.contextmanager
+    def atomico(self):
+        with self.em_lote(), self.diario.atomico():
+            yield
+
+    # Ganchos chamados pelo sistema_bancario_poo
+
+    def registrar_cliente(self, cliente):
+        campos = (cliente.cpf, cliente.nome, cliente.data_nascimento, cliente.endereco)
+        self.diario.anexar(CLIENTE, empacotar_campos(*campos))
+        self._confirmar()
+
+    def registrar_conta(self, conta):
+        conteudo = CONTA_FORMATO.pack(conta.agencia.encode("ascii"), conta.numero, conta.limite, conta.limite_saques)
+        self.diario.anexar(CONTA, conteudo + conta.cliente.cpf.encode("utf-8"))
+        self._confirmar()
+
+    def registrar_lancamento(self, conta, codigo, centavos, data):
+        conteudo = LANCAMENTO_FORMATO.pack(conta.agencia.encode("ascii"), conta.numero, codigo, centavos, data)
+        self.diario.anexar(LANCAMENTO, conteudo)
+        self._confirmar()
+        if self.diario.registros >= self.snapshot_a_cada and self.tirando_snapshot.acquire(blocking=False):
+            threading.Thread(target=self._snapshot_em_segundo_plano, daemon=True).start()
+
+    def _snapshot_em_segundo_plano(self):
+        try:
+            self.tirar_snapshot()
+        finally:
+            self.tirando_snapshot.release()
+
+    # Recuperação
+
+    def recuperar(self):
+        os.makedirs(self.diretorio, exist_ok=True)
+        banco.registro = banco.Registro()
+        caminho_snapshot = os.path.join(self.diretorio, ARQUIVO_SNAPSHOT)
+        if os.path.exists(caminho_snapshot):
+            with open(caminho_snapshot, "rb") as arquivo:
+                self.geracao = carregar_snapshot(pickle.load(arquivo))
+        geracoes = sorted(
+            int(nome.split(".")[1]) for nome in os.listdir(self.diretorio)
+            if nome.startswith("diario.") and nome.endswith(".wal")
+        )
+        for geracao in geracoes:
+            caminho = os.path.join(self.diretorio, nome_diario(geracao))
+            if geracao < self.geracao:
+                os.remove(caminho)
+                continue
+            with open(caminho, "rb") as arquivo:
+                dados = arquivo.read()
+            valido = reaplicar(dados)
+            if valido < len(dados):
+                # Final incompleto de uma gravação interrompida
+                with open(caminho, "r+b") as arquivo:
+                    arquivo.truncate(valido)
+            self.geracao = max(self.geracao, geracao)
+        contas = banco.registro.contas
+        banco.registro.ajustar_numeracao(max((numero for _, numero in contas), default=0))
+        self.diario = DiarioTransacoes(
+            os.path.join(self.diretorio, nome_diario(self.geracao)), self.lote, self.intervalo
+        )
+
+    # Snapshot
+
+    # Com a trava do registro, as travas de todas as contas e a do diário, nenhuma
+    # operação está em andamento: o estado copiado corresponde exatamente a
+    # tudo que já foi anexado ao diário atual.
+    def tirar_snapshot(self):
+        registro = banco.registro
+        diario = self.diario
+        with registro.trava, banco.travar_contas(*registro.contas.values()), diario.trava_arquivo, diario.trava:
+            self.diario.sincronizar()
+            estado = capturar_estado(registro)
+            antigo = self.diario
+            self.geracao += 1
+            estado["geracao"] = self.geracao
+            self.diario = DiarioTransacoes(
+                os.path.join(self.diretorio, nome_diario(self.geracao)), self.lote, self.intervalo
+            )
+        caminho = os.path.join(self.diretorio, ARQUIVO_SNAPSHOT)
+        temporario = caminho + ".tmp"
+        with open(temporario, "wb") as arquivo:
+            pickle.dump(estado, arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, caminho)
+        antigo.fechar()
+        os.remove(antigo.caminho)
+
+    def fechar(self):
+        self.diario.fechar()
+
+
+# O saldo guardado é o dos lançamentos: um valor reservado por uma
+# transferência entre partições ainda não lançada (ver banco_particionado)
+# volta para a conta, como aconteceria na recuperação pelo diário.
+def capturar_estado(registro):
+    clientes = [
+        (cliente.cpf, cliente.nome, cliente.data_nascimento, cliente.endereco)
+        for cliente in registro.clientes.values()
+    ]
+    contas = [
+        (
+            conta.agencia, conta.numero, conta.cliente.cpf, conta.historico.saldo_centavos, conta.limite,
+            conta.limite_saques,
+            *(coluna.tobytes() for coluna in conta.historico.colunas()),
+        )
+        for conta in registro.contas.values()
+    ]
+    return {"clientes": clientes, "contas": contas}
+
+
+def carregar_snapshot(estado):
+    registro = banco.registro
+    for cpf, nome, data_nascimento, endereco in estado["clientes"]:
+        registro.clientes[cpf] = banco.PessoaFisica(endereco, cpf, nome, data_nascimento)
+    for agencia, numero, cpf, saldo, limite, limite_saques, tipos, valores, datas in estado["contas"]:
+        conta = criar_conta(agencia, numero, cpf, limite, limite_saques)
+        conta.saldo = saldo
+        conta.historico.carregar_colunas(tipos, valores, datas)
+        hoje = time.mktime(time.localtime()[:3] + (0, 0, 0, 0, 0, -1))
+        for codigo, centavos, data in zip(*conta.historico.colunas()):
+            if codigo == banco.Historico.CODIGOS[banco.Saque.tipo] and data >= hoje:
+                conta.saques_do_dia.registrar(centavos)
+    return estado["geracao"]
+
+
+def criar_conta(agencia, numero, cpf, limite, limite_saques):
+    cliente = banco.registro.clientes[cpf]
+    conta = banco.ContaCorrente(cliente, numero, limite, limite_saques)
+    conta.agencia = agencia
+    banco.registro.contas[(agencia, numero)] = conta
+    cliente.adicionar_conta(conta)
+    return conta
+
+
+# Reaplica os registros de um diário e devolve até onde os dados eram válidos.
+def reaplicar(dados):
+    registro = banco.registro
+    sinais = banco.Historico.SINAIS
+    codigo_saque = banco.Historico.CODIGOS[banco.Saque.tipo]
+    hoje = time.mktime(time.localtime()[:3] + (0, 0, 0, 0, 0, -1))
+    valido = 0
+    for tipo, conteudo, posicao in ler_registros(dados):
+        if tipo == LANCAMENTO:
+            agencia, numero, codigo, centavos, data = LANCAMENTO_FORMATO.unpack(conteudo)
+            conta = registro.contas[(agencia.decode("ascii"), numero)]
+            conta.saldo += sinais[codigo] * centavos
+            conta.historico.gravar(codigo, centavos, data)
+            if codigo == codigo_saque and data >= hoje:
+                conta.saques_do_dia.registrar(centavos)
+        elif tipo == CONTA:
+            agencia, numero, limite, limite_saques = CONTA_FORMATO.unpack_from(conteudo)
+            cpf = conteudo[CONTA_FORMATO.size:].decode("utf-8")
+            criar_conta(agencia.decode("ascii"), numero, cpf, limite, limite_saques)
+        elif tipo == CLIENTE:
+            cpf, nome, data_nascimento, endereco = desempacotar_campos(conteudo)
+            registro.clientes[cpf] = banco.PessoaFisica(endereco, cpf, nome, data_nascimento)
+        elif tipo == CLIENTE_SEPARADO:
+            cpf, nome, data_nascimento, endereco = conteudo.decode("utf-8").split(SEPARADOR)
+            registro.clientes[cpf] = banco.PessoaFisica(endereco, cpf, nome, data_nascimento)
+        valido = posicao
+    return valido
+
+
+def ativar(diretorio, **opcoes):
+    persistencia = Persistencia(diretorio, **opcoes)
+    persistencia.recuperar()
+    banco.persistencia = persistencia
+    return persistencia
+
+
+def desativar():
+    if banco.persistencia is not None:
+        banco.persistencia.fechar()
+        banco.persistencia = None
@@ -0,0 +1,184 @@
+# Servidor asyncio para o sistema_bancario_poo.
+#
+# Expõe as operações do menu por TCP ou socket Unix num protocolo de linhas:
+# cada comando é uma linha com campos separados por tabulação e cada resposta
+# começa com OK ou ERRO.
+#
+#     USUARIO    cpf nome data_nascimento endereco  -> OK
+#     CONTA      cpf                                -> OK numero
+#     DEPOSITAR  cpf numero valor                   -> OK saldo
+#     SACAR      cpf numero valor                   -> OK saldo
+#     SALDO      cpf numero                         -> OK saldo
+#     EXTRATO    cpf numero [pagina [tamanho]]      -> OK saldo n, e n linhas
+#     ERRO codigo mensagem, com os códigos de MENSAGENS (-1 para comando
+#     malformado, -2 para falha inesperada ao executar o comando).
+#
+# As páginas do extrato começam em 1 e têm no máximo EXTRATO_TAMANHO_MAXIMO
+# lançamentos, para um único comando não formatar o histórico inteiro
+# dentro do event loop.
+#
+# O cliente pode mandar vários comandos sem esperar as respostas
+# (pipelining). O servidor lê o que chegou, executa todas as linhas completas
+# em ordem e devolve as respostas numa única escrita.
+#
+# Com --contas-sem-limite, as contas abertas pelo comando CONTA não têm limite
+# por saque nem de saques por dia, para geradores de carga como
+# benchmarks/carga_servidor.py.
+#
+# Uso: python servidor_bancario.py [host:porta | unix:/caminho.sock] [--contas-sem-limite]
+import asyncio
+import sys
+import time
+
+import dinheiro
+import sistema_bancario_poo as banco
+
+COMANDO_INVALIDO = -1
+ERRO_INTERNO = -2
+TAMANHO_LEITURA = 64 * 1024
+TAMANHO_MAXIMO_LINHA = 4096
+EXTRATO_TAMANHO_PADRAO = 50
+EXTRATO_TAMANHO_MAXIMO = 500
+CONTA_SEM_LIMITE = {"limite": dinheiro.MAXIMO, "limite_saques": dinheiro.MAXIMO}
+
+
+def erro(codigo, mensagem=None):
+    return f"ERRO\t{codigo}\t{mensagem or banco.MENSAGENS[codigo]}\n"
+
+
+def conta_do_cliente(cpf, numero):
+    cliente = banco.buscar_cliente_por_cpf(cpf)
+    if cliente is None:
+        return None
+    return banco.buscar_conta_do_cliente(cliente, int(numero))
+
+
+class ServidorBancario:
+    def __init__(self, opcoes_conta=None):
+        self.opcoes_conta = opcoes_conta or {}
+        self.conexoes = 0
+        self.comandos_atendidos = 0
+        self.comandos = {
+            "USUARIO": self.criar_usuario,
+            "CONTA": self.criar_conta,
+            "DEPOSITAR": self.depositar,
+            "SACAR": self.sacar,
+            "SALDO": self.saldo,
+            "EXTRATO": self.extrato,
+        }
+
+    def criar_usuario(self, cpf, nome, data_nascimento, endereco):
+        cliente = banco.PessoaFisica(endereco, cpf, nome, data_nascimento)
+        if not banco.registro.adicionar_cliente(cliente):
+            return erro(COMANDO_INVALIDO, "Usuário com este CPF já cadastrado.")
+        return "OK\n"
+
+    def criar_conta(self, cpf):
+        cliente = banco.buscar_cliente_por_cpf(cpf)
+        if cliente is None:
+            return erro(COMANDO_INVALIDO, "Usuário não encontrado.")
+        conta = banco.abrir_conta_corrente(cliente, **self.opcoes_conta)
+        if conta is None:
+            return erro(COMANDO_INVALIDO, "Conta já cadastrada.")
+        return f"OK\t{conta.numero}\n"
+
+    def _movimentar(self, tipo, cpf, numero, valor):
+        conta = conta_do_cliente(cpf, numero)
+        if conta is None:
+            return erro(banco.CONTA_INEXISTENTE)
+        resultado = banco.aplicar_movimento(conta, tipo, dinheiro.centavos(valor), int(time.time()))
+        if resultado != banco.ACEITA:
+            return erro(resultado)
+        return f"OK\t{dinheiro.formatar_valor(conta.saldo)}\n"
+
+    def depositar(self, cpf, numero, valor):
+        return self._movimentar(banco.Deposito.tipo, cpf, numero, valor)
+
+    def sacar(self, cpf, numero, valor):
+        return self._movimentar(banco.Saque.tipo, cpf, numero, valor)
+
+    def saldo(self, cpf, numero):
+        conta = conta_do_cliente(cpf, numero)
+        if conta is None:
+            return erro(banco.CONTA_INEXISTENTE)
+        return f"OK\t{dinheiro.formatar_valor(conta.saldo)}\n"
+
+    def extrato(self, cpf, numero, pagina=1, tamanho=EXTRATO_TAMANHO_PADRAO):
+        conta = conta_do_cliente(cpf, numero)
+        if conta is None:
+            return erro(banco.CONTA_INEXISTENTE)
+        pagina, tamanho = int(pagina), int(tamanho)
+        if pagina < 1 or not 0 <= tamanho <= EXTRATO_TAMANHO_MAXIMO:
+            return erro(COMANDO_INVALIDO, f"Página deve ser >= 1 e tamanho entre 0 e {EXTRATO_TAMANHO_MAXIMO}.")
+        historico = conta.historico
+        indices = historico.pagina(pagina, tamanho)
+        linhas = [f"OK\t{dinheiro.formatar_valor(conta.saldo)}\t{len(indices)}"]
+        linhas.extend(map(historico.formatar_transacao, indices))
+        linhas.append("")
+        return "\n".join(linhas)
+
+    def executar(self, linha):
+        campos = linha.decode("utf-8", "replace").rstrip("\r").split("\t")
+        comando = self.comandos.get(campos[0].upper())
+        if comando is None:
+            return erro(COMANDO_INVALIDO, "Comando desconhecido.")
+        try:
+            return comando(*campos[1:])
+        except (TypeError, ValueError, OverflowError):
+            return erro(COMANDO_INVALIDO, "Argumentos inválidos.")
+        # Uma falha num comando não derruba a conexão: as respostas dos
+        # comandos anteriores do mesmo lote ainda precisam ser enviadas.
+        except Exception as excecao:
+            return erro(ERRO_INTERNO, f"Falha ao executar o comando: {type(excecao).__name__}.")
+
+    async def atender(self, leitor, escritor):
+        self.conexoes += 1
+        pendente = b""
+        try:
+            while True:
+                dados = await leitor.read(TAMANHO_LEITURA)
+                if not dados:
+                    break
+                linhas = (pendente + dados).split(b"\n")
+                pendente = linhas.pop()
+                if len(pendente) > TAMANHO_MAXIMO_LINHA:
+                    escritor.write(erro(COMANDO_INVALIDO, "Linha muito longa.").encode("utf-8"))
+                    break
+                self.comandos_atendidos += len(linhas)
+                # Com persistência, as respostas só saem depois do fsync do lote,
+                # feito numa thread para não parar as outras conexões.
+                with banco.confirmacao_em_lote(esperar=False) as confirmar:
+                    respostas = "".join(map(self.executar, linhas))
+                if confirmar is not None:
+                    await asyncio.get_running_loop().run_in_executor(None, confirmar)
+                escritor.write(respostas.encode("utf-8"))
+                await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.conexoes -= 1
+            escritor.close()
+
+
+async def iniciar(endereco="127.0.0.1:7000", servidor=None):
+    servidor = servidor or ServidorBancario()
+    if endereco.startswith("unix:"):
+        return await asyncio.start_unix_server(servidor.atender, endereco[len("unix:"):], backlog=4096)
+    host, _, porta = endereco.rpartition(":")
+    return await asyncio.start_server(servidor.atender, host or None, int(porta), backlog=4096)
+
+
+async def executar(endereco, servidor=None):
+    servidor = await iniciar(endereco, servidor)
+    print(f"Servidor bancário ouvindo em {endereco}")
+    async with servidor:
+        await servidor.serve_forever()
+
+
+if __name__ == "__main__":
+    argumentos = [argumento for argumento in sys.argv[1:] if argumento != "--contas-sem-limite"]
+    opcoes_conta = CONTA_SEM_LIMITE if "--contas-sem-limite" in sys.argv[1:] else None
+    try:
+        asyncio.run(executar(argumentos[0] if argumentos else "127.0.0.1:7000", ServidorBancario(opcoes_conta)))
+    except KeyboardInterrupt:
+        pass
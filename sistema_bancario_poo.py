@@ -1,6 +1,59 @@
+import bisect
+import collections
+import contextlib
+import csv
 import datetime
+import itertools
+import sys
+import threading
+import time
+from array import array
 from abc import ABC, abstractmethod
 
+import dinheiro
+
+# Códigos de resultado das transações
+ACEITA = 0
+SALDO_INSUFICIENTE = 1
+VALOR_INVALIDO = 2
+LIMITE_EXCEDIDO = 3
+SAQUES_EXCEDIDOS = 4
+CONTA_INEXISTENTE = 5
+TIPO_INVALIDO = 6
+EM_ANDAMENTO = 7
+SALDO_EXCEDIDO = 8
+LINHA_INVALIDA = 9
+
+MENSAGENS = {
+    SALDO_INSUFICIENTE: "Saldo insuficiente!",
+    VALOR_INVALIDO: "Informe apenas valores positivos!",
+    LIMITE_EXCEDIDO: "Não é possível realizar este saque, o valor excede o limite por saque.",
+    SAQUES_EXCEDIDOS: "Operação não realizada, número de saques diários excedido.",
+    CONTA_INEXISTENTE: "Conta não encontrada.",
+    TIPO_INVALIDO: "Tipo de transação inválido.",
+    EM_ANDAMENTO: "Já existe uma transferência com esta chave em andamento.",
+    SALDO_EXCEDIDO: "Operação não realizada, o saldo ultrapassaria o máximo permitido.",
+    LINHA_INVALIDA: "Linha do lote malformada.",
+}
+
+# Armazenamento durável opcional (ver persistencia_bancaria.py). Quando
+# ativo, recebe cada cliente, conta e lançamento criado neste módulo.
+persistencia = None
+
+def operacao_atomica():
+    if persistencia is None:
+        return contextlib.nullcontext()
+    return persistencia.atomico()
+
+# Com a persistência ativa, cada operação espera o fsync do seu registro.
+# Dentro deste bloco a espera é uma só, na saída: os resultados do lote só
+# devem ser devolvidos depois dela. Com esperar=False a saída não espera e o
+# bloco entrega a função que faz a espera (None sem persistência).
+def confirmacao_em_lote(esperar=True):
+    if persistencia is None:
+        return contextlib.nullcontext()
+    return persistencia.em_lote(esperar)
+
 # Classe Cliente
 class Cliente:
     def __init__(self, endereco):
@@ -22,53 +75,258 @@ class PessoaFisica(Cliente):
         self.data_nascimento = data_nascimento
 
 # Classe Conta
+# Saldo e valores das operações em centavos inteiros (ver dinheiro.py).
 class Conta:
     def __init__(self, cliente, numero):
-        self.saldo = 0.0
+        self.saldo = 0
         self.numero = numero
         self.agencia = "0001"
         self.cliente = cliente
-        self.historico = Historico()
+        self.historico = fabrica_historico(self)
+        self.trava = threading.RLock()
 
     def saldo(self):
         return self.saldo
 
+    def saldo_em(self, data):
+        return self.historico.saldo_em(data)
+
+    def serie_saldos(self, inicio, fim):
+        return self.historico.serie_diaria(inicio, fim)
+
     @classmethod
     def nova_conta(cls, cliente, numero):
         return cls(cliente, numero)
 
-    def sacar(self, valor):
+    def validar_saque(self, valor):
+        if not dinheiro.positivo(valor):
+            return VALOR_INVALIDO
         if valor > self.saldo:
-            print("Saldo insuficiente!")
-            return False
+            return SALDO_INSUFICIENTE
+        return ACEITA
+
+    def efetivar_saque(self, valor):
         self.saldo -= valor
-        return True
 
-    def depositar(self, valor):
-        if valor <= 0:
-            print("Deposite apenas valores positivos!")
-            return False
+    def sacar(self, valor):
+        with self.trava:
+            resultado = self.validar_saque(valor)
+            if resultado != ACEITA:
+                print(MENSAGENS[resultado])
+                return False
+            self.efetivar_saque(valor)
+            return True
+
+    def validar_deposito(self, valor):
+        if not dinheiro.positivo(valor):
+            return VALOR_INVALIDO
+        if not dinheiro.cabe(self.saldo, valor):
+            return SALDO_EXCEDIDO
+        return ACEITA
+
+    def efetivar_deposito(self, valor):
         self.saldo += valor
-        return True
+
+    def depositar(self, valor):
+        with self.trava:
+            resultado = self.validar_deposito(valor)
+            if resultado != ACEITA:
+                print(MENSAGENS[resultado])
+                return False
+            self.efetivar_deposito(valor)
+            return True
 
 # Classe ContaCorrente
 class ContaCorrente(Conta):
-    def __init__(self, cliente, numero, limite=500, limite_saques=3):
+    def __init__(self, cliente, numero, limite=50_000, limite_saques=3):
         super().__init__(cliente, numero)
         self.limite = limite
-        self.limite_saques = limite_saques
+        self.saques_do_dia = dinheiro.LimiteDiario(limite_saques)
+
+    @property
+    def limite_saques(self):
+        return self.saques_do_dia.limite_quantidade
+
+    @limite_saques.setter
+    def limite_saques(self, limite_saques):
+        self.saques_do_dia.limite_quantidade = limite_saques
+
+    def validar_saque(self, valor):
+        if not dinheiro.positivo(valor):
+            return VALOR_INVALIDO
+        if self.saques_do_dia.quantidade_excedida():
+            return SAQUES_EXCEDIDOS
+        if valor > self.limite:
+            return LIMITE_EXCEDIDO
+        return super().validar_saque(valor)
+
+    def efetivar_saque(self, valor):
+        super().efetivar_saque(valor)
+        self.saques_do_dia.registrar(valor)
 
 # Classe Historico
+# As transações ficam em colunas compactas (tipo, valor em centavos e data em
+# segundos desde a época); o texto só é montado na hora de exibir o extrato.
+# Os lançamentos entram em ordem de data, o que permite achar um período por
+# busca binária e paginar o extrato sem percorrer o histórico inteiro.
+#
+# Junto com os lançamentos o histórico mantém o saldo acumulado a cada
+# INTERVALO_SALDO lançamentos e o saldo de fechamento de cada dia com
+# movimento, para responder o saldo numa data sem refazer o histórico.
 class Historico:
-    def __init__(self):
-        self.transacoes = []
+    TIPOS = ("Depósito", "Saque", "Transferência enviada", "Transferência recebida")
+    CODIGOS = {tipo: codigo for codigo, tipo in enumerate(TIPOS)}
+    SINAIS = (1, -1, -1, 1)
+    INTERVALO_SALDO = 64
+
+    def __init__(self, conta=None):
+        self.conta = conta
+        self.tipos = array("b")
+        self.valores = array("q")
+        self.datas = array("q")
+        self.iniciar_saldos()
+
+    def iniciar_saldos(self):
+        self.saldo_centavos = 0
+        self.saldos_parciais = array("q")
+        self.dias = array("l")
+        self.fechamentos = array("q")
+        self.inicio_dia = self.fim_dia = 0
+        self.ultima_data = None
+
+    # Atualiza o saldo acumulado e os índices de saldo com um lançamento.
+    def indexar(self, codigo, centavos, data):
+        self.saldo_centavos += self.SINAIS[codigo] * centavos
+        if not self.inicio_dia <= data < self.fim_dia:
+            dia = datetime.date.fromtimestamp(data)
+            self.inicio_dia = int(datetime.datetime.combine(dia, datetime.time.min).timestamp())
+            self.fim_dia = int(datetime.datetime.combine(dia + datetime.timedelta(days=1), datetime.time.min).timestamp())
+            if not self.dias or self.dias[-1] != dia.toordinal():
+                self.dias.append(dia.toordinal())
+                self.fechamentos.append(self.saldo_centavos)
+        self.fechamentos[-1] = self.saldo_centavos
+        self.ultima_data = data
+        if len(self) % self.INTERVALO_SALDO == 0:
+            self.saldos_parciais.append(self.saldo_centavos)
+
+    def __len__(self):
+        return len(self.tipos)
+
+    def __iter__(self):
+        return zip((self.TIPOS[codigo] for codigo in self.tipos), self.valores, self.datas)
+
+    def registro(self, indice):
+        return self.tipos[indice], self.valores[indice], self.datas[indice]
+
+    def colunas(self):
+        return self.tipos, self.valores, self.datas
+
+    def carregar_colunas(self, tipos, valores, datas):
+        for codigo, centavos, data in zip(array("b", tipos), array("q", valores), array("q", datas)):
+            self.gravar(codigo, centavos, data)
+
+    def gravar(self, codigo, centavos, data):
+        self.tipos.append(codigo)
+        self.valores.append(centavos)
+        self.datas.append(data)
+        self.indexar(codigo, centavos, data)
+
+    # Lotes e transferências chegam com a data já definida por quem chamou;
+    # uma data anterior à do último lançamento é gravada como a dele, para as
+    # datas nunca decrescerem e as buscas binárias continuarem valendo.
+    def adicionar(self, codigo, centavos, data):
+        if self.ultima_data is not None and data < self.ultima_data:
+            data = self.ultima_data
+        self.gravar(codigo, centavos, data)
+        if persistencia is not None and self.conta is not None:
+            persistencia.registrar_lancamento(self.conta, codigo, centavos, data)
 
     def adicionar_transacao(self, transacao):
-        self.transacoes.append(transacao)
-
-    def listar_transacoes(self):
-        for transacao in self.transacoes:
-            print(transacao)
+        self.adicionar(self.CODIGOS[transacao.tipo], transacao.valor, int(time.time()))
+
+    # Índices de uma página do extrato, do lançamento mais recente para o
+    # mais antigo (ou na ordem de inclusão, com recentes_primeiro=False).
+    # As páginas começam em 1.
+    def pagina(self, numero=1, tamanho=50, recentes_primeiro=True):
+        if numero < 1 or tamanho < 0:
+            raise ValueError(f"página inválida: número {numero}, tamanho {tamanho}")
+        total = len(self)
+        inicio = (numero - 1) * tamanho
+        if recentes_primeiro:
+            fim = max(0, total - inicio)
+            return range(fim - 1, max(0, fim - tamanho) - 1, -1)
+        return range(min(total, inicio), min(total, inicio + tamanho))
+
+    # Índices dos lançamentos entre duas datas (inclusive). Aceita date,
+    # datetime ou segundos desde a época; uma date cobre o dia inteiro.
+    def intervalo(self, inicio, fim, recentes_primeiro=True):
+        datas = self.datas
+        primeiro = bisect.bisect_left(datas, _segundos(inicio))
+        ultimo = bisect.bisect_right(datas, _segundos(fim, fim_do_dia=True))
+        if recentes_primeiro:
+            return range(ultimo - 1, primeiro - 1, -1)
+        return range(primeiro, ultimo)
+
+    # Saldo em centavos logo após os `quantidade` primeiros lançamentos: parte
+    # do último saldo parcial e soma no máximo INTERVALO_SALDO lançamentos.
+    def saldo_apos(self, quantidade):
+        bloco = quantidade // self.INTERVALO_SALDO
+        saldo = self.saldos_parciais[bloco - 1] if bloco else 0
+        sinais = self.SINAIS
+        for indice in range(bloco * self.INTERVALO_SALDO, quantidade):
+            codigo, centavos, _ = self.registro(indice)
+            saldo += sinais[codigo] * centavos
+        return saldo
+
+    # Saldo em centavos numa data. Uma date devolve o saldo de fechamento do
+    # dia; datetime ou segundos desde a época, o saldo naquele instante.
+    def saldo_em(self, data):
+        if isinstance(data, datetime.date) and not isinstance(data, datetime.datetime):
+            posicao = bisect.bisect_right(self.dias, data.toordinal())
+            return self.fechamentos[posicao - 1] if posicao else 0
+        return self.saldo_apos(bisect.bisect_right(self.datas, _segundos(data)))
+
+    # Saldo de fechamento em centavos de cada dia entre inicio e fim
+    # (inclusive), repetindo o saldo anterior nos dias sem movimento.
+    def serie_diaria(self, inicio, fim):
+        dias, fechamentos = self.dias, self.fechamentos
+        posicao = bisect.bisect_right(dias, inicio.toordinal())
+        saldo = fechamentos[posicao - 1] if posicao else 0
+        serie = []
+        for ordinal in range(inicio.toordinal(), fim.toordinal() + 1):
+            if posicao < len(dias) and dias[posicao] == ordinal:
+                saldo = fechamentos[posicao]
+                posicao += 1
+            serie.append((datetime.date.fromordinal(ordinal), saldo))
+        return serie
+
+    def formatar_transacao(self, indice):
+        codigo, centavos, data = self.registro(indice)
+        data = datetime.datetime.fromtimestamp(data)
+        return f"{self.TIPOS[codigo]}: {dinheiro.formatar(centavos)} - {data}"
+
+    def formatar_extrato(self, indices):
+        return "\n".join(map(self.formatar_transacao, indices))
+
+    def escrever_extrato(self, saida, indices=None):
+        if indices is None:
+            indices = range(len(self))
+        saida.writelines(f"{self.formatar_transacao(indice)}\n" for indice in indices)
+
+    def listar_transacoes(self, indices=None):
+        self.escrever_extrato(sys.stdout, indices)
+
+def _segundos(data, fim_do_dia=False):
+    if isinstance(data, datetime.datetime):
+        return int(data.timestamp())
+    if isinstance(data, datetime.date):
+        hora = datetime.time.max if fim_do_dia else datetime.time.min
+        return int(datetime.datetime.combine(data, hora).timestamp())
+    return int(data)
+
+# Fábrica do histórico das contas novas. Pode ser trocada, por exemplo, pelo
+# extrato em arquivo mapeado de extrato_mapeado.py.
+fabrica_historico = Historico
 
 # Interface Transacao
 class Transacao(ABC):
@@ -78,47 +336,118 @@ class Transacao(ABC):
 
 # Classe Deposito
 class Deposito(Transacao):
+    tipo = "Depósito"
+
     def __init__(self, valor):
         self.valor = valor
 
     def registrar(self, conta):
-        if conta.depositar(self.valor):
-            conta.historico.adicionar_transacao(f"Depósito: R${self.valor:.2f} - {datetime.datetime.now()}")
+        with conta.trava:
+            if conta.depositar(self.valor):
+                conta.historico.adicionar_transacao(self)
 
 # Classe Saque
 class Saque(Transacao):
+    tipo = "Saque"
+
     def __init__(self, valor):
         self.valor = valor
 
     def registrar(self, conta):
-        if conta.sacar(self.valor):
-            conta.historico.adicionar_transacao(f"Saque: R${self.valor:.2f} - {datetime.datetime.now()}")
+        with conta.trava:
+            if conta.sacar(self.valor):
+                conta.historico.adicionar_transacao(self)
+
+# Classe Transferencia
+# Registrada na conta de origem; o débito e o crédito são lançados juntos por
+# transferir(), e o código do resultado fica em `resultado`.
+class Transferencia(Transacao):
+    tipo = "Transferência enviada"
+
+    def __init__(self, destino, valor, chave=None):
+        self.destino = destino
+        self.valor = valor
+        self.chave = chave
+        self.resultado = None
+
+    def registrar(self, conta):
+        self.resultado = transferir(conta, self.destino, self.valor, self.chave)
+        if self.resultado != ACEITA:
+            print(MENSAGENS[self.resultado])
+
+# Classe Registro
+class Registro:
+    def __init__(self):
+        self.clientes = {}
+        self.contas = {}
+        self.trava = threading.Lock()
+        self._numeros_conta = itertools.count(1)
+
+    def proximo_numero_conta(self):
+        with self.trava:
+            return next(self._numeros_conta)
+
+    def ajustar_numeracao(self, ultimo_numero):
+        with self.trava:
+            self._numeros_conta = itertools.count(ultimo_numero + 1)
+
+    def adicionar_cliente(self, cliente):
+        with self.trava:
+            if cliente.cpf in self.clientes:
+                return False
+            self.clientes[cliente.cpf] = cliente
+            if persistencia is not None:
+                persistencia.registrar_cliente(cliente)
+            return True
+
+    def buscar_cliente(self, cpf):
+        return self.clientes.get(cpf)
+
+    def adicionar_conta(self, conta):
+        chave = (conta.agencia, conta.numero)
+        with self.trava:
+            if chave in self.contas:
+                return False
+            self.contas[chave] = conta
+            if persistencia is not None:
+                persistencia.registrar_conta(conta)
+            return True
+
+    def buscar_conta(self, agencia, numero):
+        return self.contas.get((agencia, numero))
 
 # Funções para gerenciamento de clientes e contas
-clientes = []
-contas = []
+registro = Registro()
 
 def buscar_cliente_por_cpf(cpf):
-    for cliente in clientes:
-        if cliente.cpf == cpf:
-            return cliente
-    return None
+    return registro.buscar_cliente(cpf)
+
+def buscar_conta_do_cliente(cliente, numero_conta, agencia="0001"):
+    conta = registro.buscar_conta(agencia, numero_conta)
+    if conta is None or conta.cliente is not cliente:
+        return None
+    return conta
 
 def criar_usuario(nome, data_nascimento, cpf, endereco):
-    if buscar_cliente_por_cpf(cpf) is not None:
-        return "Usuário com este CPF já cadastrado."
     cliente = PessoaFisica(endereco, cpf, nome, data_nascimento)
-    clientes.append(cliente)
+    if not registro.adicionar_cliente(cliente):
+        return "Usuário com este CPF já cadastrado."
     return "Usuário criado com sucesso!"
 
+def abrir_conta_corrente(cliente, **opcoes):
+    conta = ContaCorrente(cliente, registro.proximo_numero_conta(), **opcoes)
+    if not registro.adicionar_conta(conta):
+        return None
+    cliente.adicionar_conta(conta)
+    return conta
+
 def criar_conta_corrente(cpf):
     cliente = buscar_cliente_por_cpf(cpf)
     if cliente is None:
         return "Usuário não encontrado."
-    numero_conta = len(contas) + 1
-    conta = ContaCorrente(cliente, numero_conta)
-    cliente.adicionar_conta(conta)
-    contas.append(conta)
+    conta = abrir_conta_corrente(cliente)
+    if conta is None:
+        return "Conta já cadastrada."
     return f"Conta criada com sucesso! Agência: {conta.agencia}, Número da conta: {conta.numero}"
 
 def depositar(cliente, conta, valor):
@@ -129,10 +458,202 @@ def sacar(cliente, conta, valor):
     saque = Saque(valor)
     cliente.realizar_transacao(conta, saque)
 
-def exibir_extrato(conta):
+# Processamento em lote
+# Cada linha é (numero_conta, tipo, valor em centavos), com tipo "D" para depósito e "S"
+# para saque. As linhas são aplicadas na ordem, com as mesmas regras de
+# Deposito e Saque, e o resultado de cada linha volta como um código. O
+# valor também pode vir como texto em reais (ver dinheiro.centavos). Cada
+# linha é lida dentro do laço: uma linha malformada vira LINHA_INVALIDA,
+# CONTA_INEXISTENTE ou VALOR_INVALIDO e o lote continua.
+TIPOS_LOTE = {"D": Deposito.tipo, "S": Saque.tipo}
+
+def aplicar_movimento(conta, tipo, valor, data):
+    with conta.trava:
+        if tipo == Deposito.tipo:
+            resultado = conta.validar_deposito(valor)
+            if resultado == ACEITA:
+                conta.efetivar_deposito(valor)
+                conta.historico.adicionar(Historico.CODIGOS[Deposito.tipo], valor, data)
+        elif tipo == Saque.tipo:
+            resultado = conta.validar_saque(valor)
+            if resultado == ACEITA:
+                conta.efetivar_saque(valor)
+                conta.historico.adicionar(Historico.CODIGOS[Saque.tipo], valor, data)
+        else:
+            resultado = TIPO_INVALIDO
+    return resultado
+
+def processar_lote(linhas, agencia="0001"):
+    contas = registro.contas
+    data = int(time.time())
+    resultados = array("b")
+    with confirmacao_em_lote():
+        for linha in linhas:
+            try:
+                numero, tipo, valor = linha
+            except (TypeError, ValueError):
+                resultados.append(LINHA_INVALIDA)
+                continue
+            try:
+                conta = contas.get((agencia, int(numero)))
+            except (TypeError, ValueError):
+                conta = None
+            if conta is None:
+                resultados.append(CONTA_INEXISTENTE)
+                continue
+            if isinstance(valor, str):
+                try:
+                    valor = dinheiro.centavos(valor)
+                except (ValueError, OverflowError):
+                    resultados.append(VALOR_INVALIDO)
+                    continue
+            resultados.append(aplicar_movimento(conta, TIPOS_LOTE.get(tipo), valor, data))
+    return resultados
+
+def processar_lote_csv(caminho, agencia="0001"):
+    with open(caminho, newline="", encoding="utf-8") as arquivo:
+        leitor = csv.reader(arquivo, delimiter=";")
+        next(leitor, None)
+        return processar_lote(leitor, agencia)
+
+# Transferência entre contas
+# As travas das duas contas são sempre tomadas na mesma ordem (agência,
+# número), o que evita deadlock entre transferências em sentidos opostos.
+class travar_contas:
+    def __init__(self, *contas):
+        self.contas = sorted(set(contas), key=lambda conta: (conta.agencia, conta.numero))
+
+    def __enter__(self):
+        for conta in self.contas:
+            conta.trava.acquire()
+
+    def __exit__(self, *excecao):
+        for conta in reversed(self.contas):
+            conta.trava.release()
+
+# Chaves de idempotência
+# Guarda o resultado de cada transferência pela chave enviada pelo cliente,
+# para que uma repetição devolva o mesmo resultado sem lançar de novo. As
+# chaves entram em ordem de chegada, então as mais antigas saem primeiro,
+# tanto ao vencer a validade quanto ao passar da capacidade; a capacidade
+# nunca tira a chave de uma transferência ainda em andamento.
+class ChavesIdempotencia:
+    def __init__(self, capacidade=1_000_000, validade=24 * 60 * 60):
+        self.capacidade = capacidade
+        self.validade = validade
+        self.resultados = collections.OrderedDict()
+        self.trava = threading.Lock()
+
+    def __len__(self):
+        return len(self.resultados)
+
+    def _expirar(self, agora):
+        resultados = self.resultados
+        while resultados:
+            _, (_, expira_em) = next(iter(resultados.items()))
+            if expira_em > agora:
+                break
+            resultados.popitem(last=False)
+        excesso = len(resultados) - self.capacidade
+        if excesso > 0:
+            concluidas = []
+            for chave, (resultado, _) in resultados.items():
+                if resultado != EM_ANDAMENTO:
+                    concluidas.append(chave)
+                    if len(concluidas) == excesso:
+                        break
+            for chave in concluidas:
+                del resultados[chave]
+
+    # Devolve None e reserva a chave se ela é nova; senão, o resultado
+    # guardado (EM_ANDAMENTO enquanto a primeira chamada não termina).
+    def reservar(self, chave):
+        agora = time.monotonic()
+        with self.trava:
+            anterior = self.resultados.get(chave)
+            if anterior is not None and anterior[1] > agora:
+                return anterior[0]
+            self.resultados.pop(chave, None)
+            self.resultados[chave] = (EM_ANDAMENTO, agora + self.validade)
+            self._expirar(agora)
+            return None
+
+    def confirmar(self, chave, resultado):
+        with self.trava:
+            if chave in self.resultados:
+                self.resultados[chave] = (resultado, self.resultados[chave][1])
+
+    # Desfaz a reserva de uma chave cuja transferência falhou com exceção,
+    # para uma nova tentativa com a mesma chave poder executar.
+    def liberar(self, chave):
+        with self.trava:
+            anterior = self.resultados.get(chave)
+            if anterior is not None and anterior[0] == EM_ANDAMENTO:
+                del self.resultados[chave]
+
+chaves_transferencia = ChavesIdempotencia()
+
+def validar_transferencia(origem, destino, valor):
+    if not dinheiro.positivo(valor) or origem is destino:
+        return VALOR_INVALIDO
+    if valor > origem.saldo:
+        return SALDO_INSUFICIENTE
+    if not dinheiro.cabe(destino.saldo, valor):
+        return SALDO_EXCEDIDO
+    return ACEITA
+
+# Débito e crédito entram como uma unidade: com a persistência ativa os dois
+# lançamentos vão para o diário num único registro atômico.
+def efetivar_transferencia(origem, destino, valor, data):
+    with operacao_atomica():
+        origem.saldo -= valor
+        destino.saldo += valor
+        origem.historico.adicionar(Historico.CODIGOS["Transferência enviada"], valor, data)
+        destino.historico.adicionar(Historico.CODIGOS["Transferência recebida"], valor, data)
+
+def transferir(origem, destino, valor, chave=None, data=None):
+    if chave is not None:
+        anterior = chaves_transferencia.reservar(chave)
+        if anterior is not None:
+            return anterior
+    try:
+        with travar_contas(origem, destino):
+            resultado = validar_transferencia(origem, destino, valor)
+            if resultado == ACEITA:
+                efetivar_transferencia(origem, destino, valor, int(time.time()) if data is None else data)
+    except BaseException:
+        if chave is not None:
+            chaves_transferencia.liberar(chave)
+        raise
+    if chave is not None:
+        chaves_transferencia.confirmar(chave, resultado)
+    return resultado
+
+# Transferências em lote
+# Cada item é (chave, numero_origem, numero_destino, centavos); a chave pode ser
+# None. Cada transferência é atômica e idempotente pela chave, e o resultado
+# de cada item volta como um código, como em processar_lote.
+def transferir_lote(transferencias, agencia="0001"):
+    contas = registro.contas
+    data = int(time.time())
+    resultados = array("b")
+    with confirmacao_em_lote():
+        for chave, numero_origem, numero_destino, valor in transferencias:
+            origem = contas.get((agencia, int(numero_origem)))
+            destino = contas.get((agencia, int(numero_destino)))
+            if origem is None or destino is None:
+                resultados.append(CONTA_INEXISTENTE)
+                continue
+            resultados.append(transferir(origem, destino, valor, chave, data))
+    return resultados
+
+def exibir_extrato(conta, pagina=None, tamanho=50):
     print(f"Extrato da conta {conta.numero}:")
-    conta.historico.listar_transacoes()
-    print(f"Saldo atual: R${conta.saldo:.2f}")
+    if pagina is None:
+        conta.historico.listar_transacoes()
+    else:
+        conta.historico.listar_transacoes(conta.historico.pagina(pagina, tamanho))
+    print(f"Saldo atual: {dinheiro.formatar(conta.saldo)}")
 
 # Menu principal
 def main():
@@ -165,9 +686,9 @@ def main():
             cliente = buscar_cliente_por_cpf(cpf)
             if cliente:
                 numero_conta = int(input("Número da conta: "))
-                conta = next((c for c in cliente.contas if c.numero == numero_conta), None)
+                conta = buscar_conta_do_cliente(cliente, numero_conta)
                 if conta:
-                    valor = float(input("Digite o valor a ser depositado: "))
+                    valor = dinheiro.centavos(input("Digite o valor a ser depositado: "))
                     depositar(cliente, conta, valor)
                 else:
                     print("Conta não encontrada.")
@@ -178,9 +699,9 @@ def main():
             cliente = buscar_cliente_por_cpf(cpf)
             if cliente:
                 numero_conta = int(input("Número da conta: "))
-                conta = next((c for c in cliente.contas if c.numero == numero_conta), None)
+                conta = buscar_conta_do_cliente(cliente, numero_conta)
                 if conta:
-                    valor = float(input("Digite o valor a ser sacado: "))
+                    valor = dinheiro.centavos(input("Digite o valor a ser sacado: "))
                     sacar(cliente, conta, valor)
                 else:
                     print("Conta não encontrada.")
@@ -191,7 +712,7 @@ def main():
             cliente = buscar_cliente_por_cpf(cpf)
             if cliente:
                 numero_conta = int(input("Número da conta: "))
-                conta = next((c for c in cliente.contas if c.numero == numero_conta), None)
+                conta = buscar_conta_do_cliente(cliente, numero_conta)
                 if conta:
                     exibir_extrato(conta)
                 else:
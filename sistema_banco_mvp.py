@@ -1,10 +1,14 @@
 import datetime
 
+import dinheiro
+
+
+# Valores em centavos (ver dinheiro.py)
 saldo = 0
-limite_saque = 500
-limite_diario_saque = 1500
-numero_saques = 0
+limite_saque = 50_000
+limite_diario_saque = 150_000
 limite_saques_diarios = 3
+saques_do_dia = dinheiro.LimiteDiario(limite_saques_diarios, limite_diario_saque)
 extrato = []
 
 menu = """
@@ -20,29 +24,29 @@ Seja bem-vindo! Escolha a opção desejada:
 
 def depositar(valor):
     global saldo, extrato
-    if valor > 0:
+    if valor > 0 and not dinheiro.cabe(saldo, valor):
+        print("Operação não realizada, o saldo ultrapassaria o máximo permitido.")
+    elif valor > 0:
         saldo += valor
-        extrato.append(f"Depósito: R${valor:.2f} - {datetime.datetime.now()}")
-        print(f"Depósito de R${valor:.2f} realizado com sucesso!")
+        extrato.append(f"Depósito: {dinheiro.formatar(valor)} - {datetime.datetime.now()}")
+        print(f"Depósito de {dinheiro.formatar(valor)} realizado com sucesso!")
     else:
         print("Favor depositar apenas valores inteiros e positivos.")
 
 
 def sacar(valor):
-    global saldo, numero_saques, extrato
-    if numero_saques >= limite_saques_diarios:
+    global saldo, extrato
+    if saques_do_dia.quantidade_excedida():
         print("Operação não realizada, número de saques diários excedido.")
     elif valor > limite_saque:
         print("Não é possível realizar este saque, o limite por saque é de R$500.")
-    elif (valor + sum([float(trans.split("R$")[1]) for trans in extrato if
-                       'Saque' in trans and trans.split()[-1][:10] == datetime.datetime.now().strftime(
-                               '%Y-%m-%d')])) > limite_diario_saque:
+    elif saques_do_dia.valor_excedido(valor):
         print("Operação não realizada, o valor de limite diário é de R$1500.")
     elif saldo >= valor:
         saldo -= valor
-        numero_saques += 1
-        extrato.append(f"Saque: R${valor:.2f} - {datetime.datetime.now()}")
-        print(f"Saque de R${valor:.2f} realizado com sucesso!")
+        saques_do_dia.registrar(valor)
+        extrato.append(f"Saque: {dinheiro.formatar(valor)} - {datetime.datetime.now()}")
+        print(f"Saque de {dinheiro.formatar(valor)} realizado com sucesso!")
     else:
         print("Saldo insuficiente!")
 
@@ -55,28 +59,33 @@ def exibir_extrato():
         print("Extrato:")
         for transacao in extrato:
             print(transacao)
-        print(f"\nSaldo atual: R${saldo:.2f}")
-
-
-while True:
-    opcao = input(menu)
-
-    if opcao == "1":
-        try:
-            valor = int(input("Digite o valor a ser depositado: "))
-            depositar(valor)
-        except ValueError:
-            print("Favor depositar apenas valores inteiros e positivos.")
-    elif opcao == "2":
-        try:
-            valor = int(input("Digite o valor a ser sacado: "))
-            sacar(valor)
-        except ValueError:
-            print("Favor sacar apenas valores inteiros e positivos.")
-    elif opcao == "3":
-        exibir_extrato()
-    elif opcao == "0":
-        print("Obrigado por usar o sistema bancário. Até logo!")
-        break
-    else:
-        print("Opção inválida, tente novamente.")
+        print(f"\nSaldo atual: {dinheiro.formatar(saldo)}")
+
+
+def main():
+    while True:
+        opcao = input(menu)
+
+        if opcao == "1":
+            try:
+                valor = dinheiro.centavos(input("Digite o valor a ser depositado: "))
+                depositar(valor)
+            except (ValueError, OverflowError):
+                print("Favor depositar apenas valores inteiros e positivos.")
+        elif opcao == "2":
+            try:
+                valor = dinheiro.centavos(input("Digite o valor a ser sacado: "))
+                sacar(valor)
+            except (ValueError, OverflowError):
+                print("Favor sacar apenas valores inteiros e positivos.")
+        elif opcao == "3":
+            exibir_extrato()
+        elif opcao == "0":
+            print("Obrigado por usar o sistema bancário. Até logo!")
+            break
+        else:
+            print("Opção inválida, tente novamente.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+# Testes das APIs de exemplo. Rode a partir da raiz do repositório:
+#   python -m pytest tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
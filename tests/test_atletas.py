@@ -0,0 +1,135 @@
+# Testes da API de atletas (desafio_fastAPI) com SQLite.
+#
+# A API grava em ./test.db, então o módulo roda num diretório temporário, sem
+# tocar no banco do diretório atual.
+import json
+import os
+
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+ATLETAS = 120
+
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    diretorio = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("atletas"))
+    try:
+        import desafio_fastAPI as api
+
+        api.Base.metadata.create_all(bind=api.engine)
+        with api.SessionLocal() as db:
+            categorias = [api.CategoriaModel(nome=f"Categoria {indice}") for indice in range(3)]
+            centros = [
+                api.CentroDeTreinamentoModel(nome=f"CT {indice}", endereco="Rua X, 10", proprietario="Marcos")
+                for indice in range(2)
+            ]
+            db.add_all(categorias + centros)
+            db.flush()
+            db.bulk_insert_mappings(api.AtletaModel, [
+                {
+                    "nome": f"Atleta {indice}",
+                    "cpf": f"{indice:011d}",
+                    "idade": 20 + indice % 30,
+                    "peso": 60 + indice % 40,
+                    "altura": 160 + indice % 40,
+                    "sexo": "F" if indice % 2 else "M",
+                    "centro_de_treinamento_id": centros[indice % len(centros)].id,
+                    "categoria_id": categorias[indice % len(categorias)].id,
+                }
+                for indice in range(ATLETAS)
+            ])
+            db.commit()
+        yield api
+    finally:
+        os.chdir(diretorio)
+
+
+@pytest.fixture(scope="module")
+def cliente(api):
+    with TestClient(api.app) as cliente:
+        yield cliente
+
+
+# Com o cache frio, uma página custa contagem, página e uma consulta para as
+# referências; com o cache quente, só as duas primeiras.
+@pytest.mark.parametrize("fast", [False, True])
+def test_atletas_page_statements_do_not_grow_with_page_size(api, cliente, fast):
+    for tamanho in (5, 100):
+        api.categoria_cache.invalidate()
+        api.centro_cache.invalidate()
+        with api.QueryCounter() as frio:
+            resposta = cliente.get("/atletas/", params={"size": tamanho, "fast": fast})
+        assert resposta.status_code == 200
+        assert len(resposta.json()["items"]) == tamanho
+        assert resposta.json()["items"][0]["categoria"]["nome"].startswith("Categoria")
+        assert 1 <= frio.count <= 3
+        with api.QueryCounter() as quente:
+            cliente.get("/atletas/", params={"size": tamanho, "fast": fast})
+        assert 1 <= quente.count <= 2
+
+
+def test_atletas_cursor_statements_do_not_grow_with_limit(api, cliente):
+    for limite in (5, 100):
+        api.categoria_cache.invalidate()
+        api.centro_cache.invalidate()
+        with api.QueryCounter() as queries:
+            resposta = cliente.get("/atletas/cursor/", params={"limit": limite})
+        assert resposta.status_code == 200
+        assert len(resposta.json()["items"]) == limite
+        assert 1 <= queries.count <= 2
+
+
+def test_import_atletas_reports_every_line(api, cliente, monkeypatch):
+    monkeypatch.setattr(api, "IMPORT_CHUNK_SIZE", 2)
+    monkeypatch.setattr(api, "IMPORT_SPOOL_SIZE", 64)
+    novo = {
+        "nome": "Importado", "idade": 25, "peso": 70, "altura": 175, "sexo": "F",
+        "centro_de_treinamento_id": 1, "categoria_id": 1,
+    }
+    linhas = [
+        json.dumps({**novo, "cpf": "90000000001"}),
+        json.dumps({**novo, "cpf": "90000000002"}),
+        json.dumps({**novo, "cpf": "90000000001"}),
+        json.dumps({**novo, "cpf": f"{0:011d}"}),
+        json.dumps({"cpf": "90000000003"}),
+    ]
+    resposta = cliente.post("/atletas/import/", content="\n".join(linhas),
+                            headers={"content-type": "application/x-ndjson"})
+    assert resposta.status_code == 200
+    *resultados, resumo = [json.loads(linha) for linha in resposta.text.splitlines()]
+    assert [(r["linha"], r["status"]) for r in resultados] == [
+        (1, "inserido"), (2, "inserido"), (3, "cpf_duplicado"), (4, "cpf_duplicado"), (5, "invalido"),
+    ]
+    assert resumo == {"resumo": {"inserido": 2, "cpf_duplicado": 2, "invalido": 1}}
+
+
+def test_import_atletas_keeps_input_order(api, cliente, monkeypatch):
+    monkeypatch.setattr(api, "IMPORT_CHUNK_SIZE", 3)
+    novo = {
+        "nome": "Ordem", "idade": 25, "peso": 70, "altura": 175, "sexo": "F",
+        "centro_de_treinamento_id": 1, "categoria_id": 1,
+    }
+    linhas = [
+        {**novo, "cpf": "91000000001"},
+        {"cpf": "91000000002"},
+        {**novo, "cpf": "91000000003"},
+        {**novo, "cpf": "91000000004"},
+        "não é um atleta",
+    ]
+    resposta = cliente.post("/atletas/import/", json=linhas)
+    assert resposta.status_code == 200
+    *resultados, resumo = [json.loads(linha) for linha in resposta.text.splitlines()]
+    assert [(r["linha"], r["status"]) for r in resultados] == [
+        (1, "inserido"), (2, "invalido"), (3, "inserido"), (4, "inserido"), (5, "invalido"),
+    ]
+    assert resultados[1]["cpf"] == "91000000002"
+    assert resumo == {"resumo": {"inserido": 3, "cpf_duplicado": 0, "invalido": 2}}
+
+
+def test_import_atletas_rejects_a_json_object(cliente):
+    resposta = cliente.post("/atletas/import/", json={"cpf": "92000000001"})
+    assert resposta.status_code == 400
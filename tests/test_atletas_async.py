@@ -0,0 +1,55 @@
+# Testes da API de atletas assíncrona (desafio_fastAPI_async) com aiosqlite.
+#
+# Como a versão síncrona, a API grava em ./test.db, então o módulo roda num
+# diretório temporário.
+import os
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("aiosqlite")
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    diretorio = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("atletas_async"))
+    try:
+        import desafio_fastAPI_async as api
+
+        yield api
+    finally:
+        os.chdir(diretorio)
+
+
+@pytest.fixture(scope="module")
+def cliente(api):
+    with TestClient(api.app) as cliente:
+        yield cliente
+
+
+def test_import_configures_sized_pool(api):
+    pool = api.async_engine.sync_engine.pool
+    assert pool.size() == api.POOL_SIZE
+
+
+def test_create_and_list_atletas(api, cliente):
+    categoria = cliente.post("/categorias/", json={"nome": "Scale"}).json()
+    centro = cliente.post("/centros_de_treinamento/", json={
+        "nome": "CT King", "endereco": "Rua X, 10", "proprietario": "Marcos",
+    }).json()
+    atleta = {
+        "nome": "Ana", "cpf": "12345678900", "idade": 25, "peso": 60, "altura": 165, "sexo": "F",
+        "centro_de_treinamento_id": centro["id"], "categoria_id": categoria["id"],
+    }
+    resposta = cliente.post("/atletas/", json=atleta)
+    assert resposta.status_code == 200
+    assert resposta.json()["categoria"] == categoria
+    assert resposta.json()["centro_de_treinamento"] == centro
+    assert cliente.post("/atletas/", json=atleta).status_code == 303
+    pagina = cliente.get("/atletas/", params={"cpf": "12345678900"}).json()
+    assert pagina["total"] == 1
+    assert pagina["items"][0]["nome"] == "Ana"
+    metricas = cliente.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/atletas/",status="200"} 1' in metricas
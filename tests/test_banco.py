@@ -0,0 +1,89 @@
+# Testes do núcleo bancário (sistema_bancario_poo).
+import pytest
+
+import sistema_bancario_poo as banco
+
+
+@pytest.fixture(autouse=True)
+def registro(monkeypatch):
+    monkeypatch.setattr(banco, "registro", banco.Registro())
+    monkeypatch.setattr(banco, "chaves_transferencia", banco.ChavesIdempotencia())
+    return banco.registro
+
+
+@pytest.fixture
+def conta():
+    banco.criar_usuario("Ana", "01/01/1990", "00000000000", "Rua X, 1")
+    return banco.abrir_conta_corrente(banco.buscar_cliente_por_cpf("00000000000"))
+
+
+def test_processar_lote_rejects_malformed_rows_and_keeps_going(conta):
+    resultados = banco.processar_lote([
+        (conta.numero, "D", 1_000),
+        ("x", "D", 100),
+        (conta.numero, "D"),
+        (conta.numero, "D", "abc"),
+        (conta.numero, "D", 1.5),
+        (conta.numero, "D", "2,50"),
+    ])
+    assert resultados.tolist() == [
+        banco.ACEITA, banco.CONTA_INEXISTENTE, banco.LINHA_INVALIDA,
+        banco.VALOR_INVALIDO, banco.VALOR_INVALIDO, banco.ACEITA,
+    ]
+    assert conta.saldo == 1_250
+    assert len(conta.historico) == 2
+
+
+def test_processar_lote_csv_reports_each_row(conta, tmp_path):
+    caminho = tmp_path / "lote.csv"
+    caminho.write_text(f"conta;tipo;valor\n{conta.numero};D;10\n{conta.numero};D;abc\n{conta.numero};D;5\n",
+                       encoding="utf-8")
+    assert banco.processar_lote_csv(caminho).tolist() == [banco.ACEITA, banco.VALOR_INVALIDO, banco.ACEITA]
+    assert conta.saldo == 1_500
+
+
+@pytest.mark.parametrize("mapeado", [False, True])
+def test_datas_do_historico_nunca_decrescem(mapeado, tmp_path, monkeypatch):
+    if mapeado:
+        import extrato_mapeado
+        monkeypatch.setattr(banco, "fabrica_historico", banco.fabrica_historico)
+        extrato_mapeado.ativar(tmp_path)
+    banco.criar_usuario("Ana", "01/01/1990", "00000000000", "Rua X, 1")
+    conta = banco.abrir_conta_corrente(banco.buscar_cliente_por_cpf("00000000000"))
+    t = 1_700_000_000
+    assert banco.aplicar_movimento(conta, banco.Deposito.tipo, 1_000, t + 5) == banco.ACEITA
+    assert banco.aplicar_movimento(conta, banco.Deposito.tipo, 7, t) == banco.ACEITA
+    historico = conta.historico
+    assert [historico.registro(i)[2] for i in range(len(historico))] == [t + 5, t + 5]
+    assert historico.saldo_em(t + 1) == 0
+    assert historico.saldo_em(t + 5) == 1_007
+    assert list(historico.intervalo(t, t)) == []
+    assert list(historico.intervalo(t, t + 5)) == [1, 0]
+
+
+def test_transferencia_que_falha_libera_a_chave(conta, monkeypatch):
+    destino = banco.abrir_conta_corrente(banco.buscar_cliente_por_cpf("00000000000"))
+    banco.processar_lote([(conta.numero, "D", 1_000)])
+
+    def falhar(*argumentos):
+        raise OSError("disco cheio")
+
+    efetivar = banco.efetivar_transferencia
+    monkeypatch.setattr(banco, "efetivar_transferencia", falhar)
+    with pytest.raises(OSError):
+        banco.transferir(conta, destino, 100, chave="k1")
+    monkeypatch.setattr(banco, "efetivar_transferencia", efetivar)
+    assert banco.transferir(conta, destino, 100, chave="k1") == banco.ACEITA
+    assert banco.transferir(conta, destino, 100, chave="k1") == banco.ACEITA
+    assert (conta.saldo, destino.saldo) == (900, 100)
+
+
+def test_capacidade_nao_tira_chaves_em_andamento():
+    chaves = banco.ChavesIdempotencia(capacidade=2)
+    assert chaves.reservar("a") is None
+    assert chaves.reservar("b") is None
+    chaves.confirmar("b", banco.ACEITA)
+    assert chaves.reservar("c") is None
+    assert chaves.reservar("d") is None
+    assert chaves.reservar("a") == banco.EM_ANDAMENTO
+    assert len(chaves) == 3
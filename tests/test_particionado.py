@@ -0,0 +1,51 @@
+# Testes das transferências entre partições do banco_particionado.
+import pytest
+
+import banco_particionado
+import dinheiro
+import persistencia_bancaria
+import sistema_bancario_poo as banco
+
+
+@pytest.fixture(scope="module")
+def motor():
+    with banco_particionado.MotorParticionado(2) as motor:
+        motor.criar_cliente("00000000000", "Ana", "01/01/1990", "Rua X, 1")
+        yield motor
+
+
+def test_credito_que_estouraria_o_saldo_devolve_a_reserva(motor):
+    origem, destino = motor.criar_conta("00000000000"), motor.criar_conta("00000000000")
+    assert motor.particao(origem) != motor.particao(destino)
+    resultados = motor.processar([
+        (origem, "D", 1_000),
+        (origem, "T", 500, destino),
+        (destino, "D", dinheiro.MAXIMO),
+    ])
+    assert resultados.tolist() == [banco.ACEITA, banco.SALDO_EXCEDIDO, banco.ACEITA]
+    assert motor.saldo(origem) == 1_000
+    assert motor.saldo(destino) == dinheiro.MAXIMO
+    resultados = motor.processar([(origem, "T", 100, destino)])
+    assert resultados.tolist() == [banco.SALDO_EXCEDIDO]
+    assert motor.saldo(origem) == 1_000
+
+
+def test_snapshot_entre_as_fases_nao_perde_a_reserva(tmp_path, monkeypatch):
+    monkeypatch.setattr(banco, "registro", banco.Registro())
+    persistencia = persistencia_bancaria.ativar(tmp_path)
+    try:
+        particao = banco_particionado.Particao()
+        particao.criar_cliente("00000000000", "Ana", "01/01/1990", "Rua X, 1")
+        particao.criar_conta(1, "00000000000")
+        assert particao.executar([(1, "D", 1_000), (1, banco_particionado.RESERVA, 300, 0)]).tolist() == [
+            banco.ACEITA, banco.ACEITA,
+        ]
+        assert particao.saldo(1) == 700
+        persistencia.tirar_snapshot()
+    finally:
+        persistencia_bancaria.desativar()
+    persistencia_bancaria.ativar(tmp_path)
+    try:
+        assert banco.registro.contas[("0001", 1)].saldo == 1_000
+    finally:
+        persistencia_bancaria.desativar()
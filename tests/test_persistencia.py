@@ -0,0 +1,145 @@
+# Testes de recuperação do persistencia_bancaria: diário, grupos atômicos e
+# snapshots.
+import asyncio
+import os
+import threading
+
+import pytest
+
+import persistencia_bancaria
+import servidor_bancario
+import sistema_bancario_poo as banco
+
+
+@pytest.fixture(autouse=True)
+def estado(monkeypatch):
+    monkeypatch.setattr(banco, "registro", banco.Registro())
+    monkeypatch.setattr(banco, "chaves_transferencia", banco.ChavesIdempotencia())
+    yield
+    persistencia_bancaria.desativar()
+
+
+def abrir_contas(quantidade, nome="Ana", endereco="Rua X, 1"):
+    banco.criar_usuario(nome, "01/01/1990", "00000000000", endereco)
+    cliente = banco.buscar_cliente_por_cpf("00000000000")
+    return [banco.abrir_conta_corrente(cliente) for _ in range(quantidade)]
+
+
+def reabrir(diretorio):
+    persistencia_bancaria.desativar()
+    persistencia_bancaria.ativar(diretorio)
+    return banco.registro
+
+
+def saldos(registro):
+    return {numero: conta.saldo for (_, numero), conta in registro.contas.items()}
+
+
+def diario_atual():
+    return banco.persistencia.diario.caminho
+
+
+def test_cliente_com_qualquer_caractere(tmp_path):
+    persistencia_bancaria.ativar(tmp_path)
+    abrir_contas(1, nome="Ana\x1fMaria", endereco="Rua\x1f, 1\nBloco B")
+    registro = reabrir(tmp_path)
+    cliente = registro.buscar_cliente("00000000000")
+    assert cliente.nome == "Ana\x1fMaria"
+    assert cliente.endereco == "Rua\x1f, 1\nBloco B"
+
+
+def test_final_incompleto_e_descartado(tmp_path):
+    persistencia_bancaria.ativar(tmp_path)
+    (conta,) = abrir_contas(1)
+    banco.processar_lote([(conta.numero, "D", 1_000), (conta.numero, "D", 500)])
+    caminho = diario_atual()
+    persistencia_bancaria.desativar()
+    tamanho = os.path.getsize(caminho)
+    registro_completo = persistencia_bancaria.empacotar(
+        persistencia_bancaria.LANCAMENTO,
+        persistencia_bancaria.LANCAMENTO_FORMATO.pack(b"0001", conta.numero, 0, 700, 0),
+    )
+    with open(caminho, "ab") as arquivo:
+        arquivo.write(registro_completo[:-3])
+    registro = reabrir(tmp_path)
+    assert saldos(registro) == {conta.numero: 1_500}
+    assert len(registro.contas[("0001", conta.numero)].historico) == 2
+    assert os.path.getsize(caminho) == tamanho
+
+
+def test_transferencia_e_reaplicada_inteira_ou_nada(tmp_path):
+    persistencia_bancaria.ativar(tmp_path)
+    origem, destino = abrir_contas(2)
+    banco.processar_lote([(origem.numero, "D", 1_000)])
+    caminho = diario_atual()
+    antes = os.path.getsize(caminho)
+    assert banco.transferir(origem, destino, 300) == banco.ACEITA
+    persistencia_bancaria.desativar()
+    depois = os.path.getsize(caminho)
+
+    registro = reabrir(tmp_path)
+    assert saldos(registro) == {origem.numero: 700, destino.numero: 300}
+
+    persistencia_bancaria.desativar()
+    with open(caminho, "r+b") as arquivo:
+        arquivo.truncate(depois - 1)
+    registro = reabrir(tmp_path)
+    assert saldos(registro) == {origem.numero: 1_000, destino.numero: 0}
+    assert os.path.getsize(caminho) == antes
+
+
+def test_snapshot_e_diarios_posteriores(tmp_path):
+    persistencia = persistencia_bancaria.ativar(tmp_path)
+    conta, outra = abrir_contas(2)
+    banco.processar_lote([(conta.numero, "D", 1_000)])
+    persistencia.tirar_snapshot()
+    banco.processar_lote([(conta.numero, "S", 200)])
+    assert banco.transferir(conta, outra, 100) == banco.ACEITA
+
+    registro = reabrir(tmp_path)
+    assert saldos(registro) == {conta.numero: 700, outra.numero: 100}
+    assert len(registro.contas[("0001", conta.numero)].historico) == 3
+    banco.processar_lote([(outra.numero, "D", 50)])
+    banco.persistencia.tirar_snapshot()
+    banco.processar_lote([(outra.numero, "D", 25)])
+
+    registro = reabrir(tmp_path)
+    assert saldos(registro) == {conta.numero: 700, outra.numero: 175}
+    diarios = sorted(nome for nome in os.listdir(tmp_path) if nome.endswith(".wal"))
+    assert diarios == [persistencia_bancaria.nome_diario(banco.persistencia.geracao)]
+    assert banco.criar_conta_corrente("00000000000")
+    assert max(numero for _, numero in registro.contas) == 3
+
+
+def test_servidor_confirma_fora_do_event_loop(tmp_path, monkeypatch):
+    persistencia = persistencia_bancaria.ativar(tmp_path)
+    threads = []
+    confirmar = persistencia.diario.confirmar
+
+    def confirmar_registrando():
+        threads.append(threading.current_thread())
+        confirmar()
+
+    monkeypatch.setattr(persistencia.diario, "confirmar", confirmar_registrando)
+
+    async def conversar():
+        servidor = await servidor_bancario.iniciar("127.0.0.1:0")
+        porta = servidor.sockets[0].getsockname()[1]
+        leitor, escritor = await asyncio.open_connection("127.0.0.1", porta)
+        escritor.write(
+            b"USUARIO\t00000000000\tAna\t01/01/1990\tRua X\n"
+            b"CONTA\t00000000000\n"
+            b"DEPOSITAR\t00000000000\t1\t10.50\n"
+        )
+        respostas = [await leitor.readline() for _ in range(3)]
+        escritor.close()
+        await escritor.wait_closed()
+        servidor.close()
+        await servidor.wait_closed()
+        return respostas, threading.current_thread()
+
+    respostas, thread_do_loop = asyncio.run(conversar())
+    assert respostas == [b"OK\n", b"OK\t1\n", b"OK\t10.50\n"]
+    assert threads and thread_do_loop not in threads
+    registro = reabrir(tmp_path)
+    assert saldos(registro) == {1: 1_050}
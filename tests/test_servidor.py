@@ -0,0 +1,30 @@
+# Testes do servidor_bancario chamando os comandos direto, sem socket.
+import pytest
+
+import servidor_bancario
+import sistema_bancario_poo as banco
+
+
+@pytest.fixture(autouse=True)
+def registro(monkeypatch):
+    monkeypatch.setattr(banco, "registro", banco.Registro())
+
+
+def executar(servidor, *linhas):
+    return [servidor.executar(linha.encode("utf-8")) for linha in linhas]
+
+
+def test_contas_sem_limite_aceitam_saques_acima_do_limite_diario():
+    servidor = servidor_bancario.ServidorBancario(servidor_bancario.CONTA_SEM_LIMITE)
+    executar(servidor, "USUARIO\t00000000000\tAna\t01/01/1990\tRua X", "CONTA\t00000000000",
+             "DEPOSITAR\t00000000000\t1\t10000")
+    respostas = executar(servidor, *["SACAR\t00000000000\t1\t1"] * 5, "SACAR\t00000000000\t1\t1000")
+    assert all(resposta.startswith("OK\t") for resposta in respostas)
+
+
+def test_contas_padrao_mantem_o_limite_de_saques():
+    servidor = servidor_bancario.ServidorBancario()
+    executar(servidor, "USUARIO\t00000000000\tAna\t01/01/1990\tRua X", "CONTA\t00000000000",
+             "DEPOSITAR\t00000000000\t1\t100")
+    respostas = executar(servidor, *["SACAR\t00000000000\t1\t1"] * 4)
+    assert respostas[-1] == servidor_bancario.erro(banco.SAQUES_EXCEDIDOS)